@@ -0,0 +1,30 @@
+"""otp user created index
+
+Revision ID: 004fb5a39334
+Revises: e2cf5976c48e
+Create Date: 2026-10-18 19:46:02.104211
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004fb5a39334"
+down_revision = "e2cf5976c48e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_admin_user_otps_admin_user_id_created_at",
+        "admin_user_otps",
+        ["admin_user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_admin_user_otps_admin_user_id_created_at", table_name="admin_user_otps"
+    )
@@ -0,0 +1,25 @@
+"""email outbox lease
+
+Revision ID: 3c9e7b52d018
+Revises: 8d3f2a61c7b4
+Create Date: 2026-10-18 21:24:51.630174
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c9e7b52d018"
+down_revision = "8d3f2a61c7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "email_outbox", sa.Column("lease_id", sa.String(length=36), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("email_outbox", "lease_id")
@@ -0,0 +1,52 @@
+"""project status counters
+
+Revision ID: 505efdbfa0c0
+Revises: e546962aecc6
+Create Date: 2026-10-18 22:48:12.604117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "505efdbfa0c0"
+down_revision = "e546962aecc6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `python -m app.rebuild_counters` once migrated
+    op.create_table(
+        "project_status_counters",
+        sa.Column("module_id", sa.String(length=36), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("priority", sa.String(length=20), nullable=False),
+        sa.Column("project_id", sa.String(length=36), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["module_id"],
+            ["modules.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["project_id"],
+            ["projects.id"],
+        ),
+        sa.PrimaryKeyConstraint("module_id", "kind", "status", "priority"),
+    )
+    op.create_index(
+        op.f("ix_project_status_counters_project_id"),
+        "project_status_counters",
+        ["project_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_project_status_counters_project_id"),
+        table_name="project_status_counters",
+    )
+    op.drop_table("project_status_counters")
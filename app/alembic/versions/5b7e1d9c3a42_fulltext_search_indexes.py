@@ -0,0 +1,33 @@
+"""fulltext search indexes
+
+Revision ID: 5b7e1d9c3a42
+Revises: 0cf2b4f87170
+Create Date: 2026-10-18 20:52:37.204118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b7e1d9c3a42"
+down_revision = "0cf2b4f87170"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_projects_fulltext", "projects", ["name", "description"]),
+    ("ix_module_types_fulltext", "module_types", ["name"]),
+    ("ix_modules_fulltext", "modules", ["name", "description"]),
+    ("ix_tasks_fulltext", "tasks", ["name", "description"]),
+    ("ix_issues_fulltext", "issues", ["name", "description"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, mysql_prefix="FULLTEXT")
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""list sort indexes
+
+Revision ID: 64ac1ff11592
+Revises: 5b7e1d9c3a42
+Create Date: 2026-10-18 21:14:09.331472
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "64ac1ff11592"
+down_revision = "5b7e1d9c3a42"
+branch_labels = None
+depends_on = None
+
+# is_deleted == False filter plus the default sort, id as the keyset tie-breaker
+INDEXES = [
+    ("ix_admin_users_is_deleted_created_at_id", "admin_users", "created_at"),
+    ("ix_roles_is_deleted_updated_at_id", "roles", "updated_at"),
+    ("ix_projects_is_deleted_created_at_id", "projects", "created_at"),
+    ("ix_module_types_is_deleted_created_at_id", "module_types", "created_at"),
+    ("ix_modules_is_deleted_created_at_id", "modules", "created_at"),
+    ("ix_tasks_is_deleted_created_at_id", "tasks", "created_at"),
+    ("ix_issues_is_deleted_created_at_id", "issues", "created_at"),
+]
+
+
+def upgrade():
+    for name, table, column in INDEXES:
+        op.create_index(name, table, ["is_deleted", column, "id"], unique=False)
+
+
+def downgrade():
+    for name, table, column in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
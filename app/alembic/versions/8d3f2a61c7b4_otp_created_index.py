@@ -0,0 +1,28 @@
+"""otp created index
+
+Revision ID: 8d3f2a61c7b4
+Revises: 505efdbfa0c0
+Create Date: 2026-10-18 21:02:37.418305
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d3f2a61c7b4"
+down_revision = "505efdbfa0c0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_admin_user_otps_created_at",
+        "admin_user_otps",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_admin_user_otps_created_at", table_name="admin_user_otps")
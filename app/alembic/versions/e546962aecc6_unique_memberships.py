@@ -0,0 +1,62 @@
+"""unique memberships
+
+Revision ID: e546962aecc6
+Revises: 64ac1ff11592
+Create Date: 2026-10-18 22:05:41.208364
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e546962aecc6"
+down_revision = "64ac1ff11592"
+branch_labels = None
+depends_on = None
+
+MEMBERSHIPS = [
+    ("uq_project_users_project_id_admin_user_id", "project_users", "project_id"),
+    ("uq_issue_users_issue_id_admin_user_id", "issue_users", "issue_id"),
+]
+
+DELETE_CHUNK = 1000
+
+
+def delete_duplicates(table: str, parent_column: str):
+    # Keep the oldest row of every (parent, admin user) pair
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            f"SELECT id, {parent_column}, admin_user_id FROM {table} "
+            "ORDER BY created_at, id"
+        )
+    )
+    seen = set()
+    duplicates = []
+    for id, parent_id, admin_user_id in rows:
+        if (parent_id, admin_user_id) in seen:
+            duplicates.append(id)
+        else:
+            seen.add((parent_id, admin_user_id))
+
+    for i in range(0, len(duplicates), DELETE_CHUNK):
+        conn.execute(
+            sa.text(f"DELETE FROM {table} WHERE id IN :ids").bindparams(
+                sa.bindparam("ids", expanding=True)
+            ),
+            {"ids": duplicates[i : i + DELETE_CHUNK]},
+        )
+
+
+def upgrade():
+    for name, table, parent_column in MEMBERSHIPS:
+        delete_duplicates(table, parent_column)
+        op.create_unique_constraint(name, table, [parent_column, "admin_user_id"])
+
+
+def downgrade():
+    for name, table, parent_column in reversed(MEMBERSHIPS):
+        # MySQL moved the foreign key onto the unique index, it needs another
+        # index on the parent column before the constraint can go
+        op.create_index(f"ix_{table}_{parent_column}", table, [parent_column])
+        op.drop_constraint(name, table, type_="unique")
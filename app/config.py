@@ -21,6 +21,87 @@ RE_CAPTCHA_SECRET = os.environ.get("PRO_RE_CAPTCHA_SECRET")
 SES_FROM_EMAIL = os.environ.get("PRO_SES_FROM_EMAIL")
 BUCKET_NAME = os.environ.get("PRO_BUCKET_NAME")
 
+# Key ring, a JWK set ({"keys": [...]}) where every key has a kid
+JWT_KEYS = os.environ.get("PRO_JWT_KEYS")
+JWT_KEYS_FILE = os.environ.get("PRO_JWT_KEYS_FILE")
+JWT_ACTIVE_KID = os.environ.get("PRO_JWT_ACTIVE_KID")
+KEY_RING_RELOAD_INTERVAL = int(os.environ.get("PRO_KEY_RING_RELOAD_INTERVAL", "30"))
+
+# Token profile for new tokens: nested | signed | encrypted
+TOKEN_PROFILE = os.environ.get("PRO_TOKEN_PROFILE", "nested")
+
+# Decoded token cache, per process: other workers see deleted, demoted or
+# password changed admin users once their entry is older than the TTL
+TOKEN_CACHE_SIZE = int(os.environ.get("PRO_TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = int(os.environ.get("PRO_TOKEN_CACHE_TTL", "30"))
+
+# Permission matrix refresh for changes made by other worker processes
+PERMISSION_MATRIX_TTL = int(os.environ.get("PRO_PERMISSION_MATRIX_TTL", "60"))
+MENU_CACHE_SIZE = int(os.environ.get("PRO_MENU_CACHE_SIZE", "100"))
+
+# Operation tree refresh, operations are seeded outside the app
+OPERATION_TREE_TTL = int(os.environ.get("PRO_OPERATION_TREE_TTL", "300"))
+
+# Dedicated bcrypt pool
+PASSWORD_HASH_WORKERS = int(os.environ.get("PRO_PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PRO_PASSWORD_HASH_QUEUE_SIZE", "8"))
+
+# OTP storage: sql | memory
+OTP_STORE = os.environ.get("PRO_OTP_STORE", "sql")
+OTP_TTL_MINUTES = int(os.environ.get("PRO_OTP_TTL_MINUTES", "10"))
+OTP_PURGE_INTERVAL = int(os.environ.get("PRO_OTP_PURGE_INTERVAL", "3600"))
+
+# Default total count strategy of list endpoints, see app/libs/counts.py
+LIST_COUNT_MODE = os.environ.get("PRO_LIST_COUNT_MODE", "exact")
+COUNT_CACHE_SIZE = int(os.environ.get("PRO_COUNT_CACHE_SIZE", "1000"))
+# Cached and estimated counts are only dropped by writes in the same process,
+# other workers can serve them this many seconds stale
+COUNT_CACHE_TTL = int(os.environ.get("PRO_COUNT_CACHE_TTL", "30"))
+
+# Project summaries, cleared on writes in this process and expired after the
+# TTL for writes made by other workers
+SUMMARY_CACHE_SIZE = int(os.environ.get("PRO_SUMMARY_CACHE_SIZE", "1000"))
+SUMMARY_CACHE_TTL = int(os.environ.get("PRO_SUMMARY_CACHE_TTL", "30"))
+
+# Largest request accepted by the bulk create/update endpoints
+BULK_MAX_ITEMS = int(os.environ.get("PRO_BULK_MAX_ITEMS", "1000"))
+
+# Rows fetched per server-side cursor batch by the /export endpoints
+EXPORT_BATCH_SIZE = int(os.environ.get("PRO_EXPORT_BATCH_SIZE", "1000"))
+
+# Modules loaded per batch by the streamed /projects/{id}/tree
+TREE_BATCH_SIZE = int(os.environ.get("PRO_TREE_BATCH_SIZE", "20"))
+
+# PDF project reports, rendered by a process pool and kept on disk per
+# project data version
+REPORT_DIR = os.environ.get("PRO_REPORT_DIR", os.path.join("app", "reports"))
+REPORT_WORKERS = int(os.environ.get("PRO_REPORT_WORKERS", "2"))
+REPORT_JOB_TTL = int(os.environ.get("PRO_REPORT_JOB_TTL", "3600"))
+
+# reCAPTCHA verification
+RE_CAPTCHA_ENABLED = os.environ.get("PRO_RE_CAPTCHA_ENABLED", "false") == "true"
+RE_CAPTCHA_URL = os.environ.get(
+    "PRO_RE_CAPTCHA_URL", "https://www.google.com/recaptcha/api/siteverify"
+)
+RE_CAPTCHA_TIMEOUT = float(os.environ.get("PRO_RE_CAPTCHA_TIMEOUT", "3"))
+# Let requests through (true) or reject them (false) while Google is unreachable
+RE_CAPTCHA_FAIL_OPEN = os.environ.get("PRO_RE_CAPTCHA_FAIL_OPEN", "false") == "true"
+RE_CAPTCHA_BREAKER_THRESHOLD = int(
+    os.environ.get("PRO_RE_CAPTCHA_BREAKER_THRESHOLD", "5")
+)
+RE_CAPTCHA_BREAKER_RESET = int(os.environ.get("PRO_RE_CAPTCHA_BREAKER_RESET", "30"))
+
+# Email delivery: ses | smtp (e.g. a local SMTP stand-in for tests)
+EMAIL_BACKEND = os.environ.get("PRO_EMAIL_BACKEND", "ses")
+SMTP_HOST = os.environ.get("PRO_SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("PRO_SMTP_PORT", "1025"))
+EMAIL_OUTBOX_INTERVAL = int(os.environ.get("PRO_EMAIL_OUTBOX_INTERVAL", "2"))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("PRO_EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("PRO_EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_BACKOFF = int(os.environ.get("PRO_EMAIL_OUTBOX_BACKOFF", "30"))
+# How long a claimed batch is left to its worker before others may retry it
+EMAIL_OUTBOX_LEASE = int(os.environ.get("PRO_EMAIL_OUTBOX_LEASE", "900"))
+
 if JWT_KEY:
     try:
         JWT_KEY = json.loads(JWT_KEY)
@@ -28,7 +109,7 @@ if JWT_KEY:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid JWT key"
         )
-else:
+elif not (JWT_KEYS or JWT_KEYS_FILE):
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="JWT key not set"
     )
@@ -1,4 +1,10 @@
+from fastapi import Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
 from app.database import SessionLocal
+from app.routers.admin.crud.admin_users import admin_users
+from app.routers.admin.crud.operations import operations
+from app.routers.admin.schemas import Principal
 
 
 # Dependency
@@ -8,3 +14,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_principal(
+    request: Request, token: str = Header(None), db: Session = Depends(get_db)
+) -> Principal:
+    principal = admin_users.verify_token(db, token=token)
+    request.state.principal = principal
+    return principal
+
+
+def require(operation: str):
+    def verify_operation(
+        principal: Principal = Depends(get_principal), db: Session = Depends(get_db)
+    ) -> Principal:
+        if not operations.has_operation(db, principal, operation):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="You don't have permission.",
+            )
+        return principal
+
+    return verify_operation
@@ -0,0 +1,186 @@
+"""Explain the queries the list endpoints and CRUD lookups run.
+
+python -m app.index_advisor [--all-sorts]
+
+Flags filesorts, full table scans and foreign keys without a supporting
+index, exits with 1 when anything is flagged.
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from app.database import SessionLocal
+from app.libs.utils import build_list_query, order_keyset
+from app.models import (
+    AdminUserModel,
+    AdminUserOtpModel,
+    AdminUserRoleModel,
+    IssueModel,
+    ModuleModel,
+    ModuleTypeModel,
+    OperationModel,
+    ProjectModel,
+    ProjectUserModel,
+    RoleModel,
+    RoleOperationModel,
+    TaskModel,
+)
+from app.models.emails import EmailOutboxModel, EmailStatusEnum
+from app.routers.admin.crud.admin_users.admin_users import build_admin_users_query
+from app.routers.admin.crud.roles.roles import build_roles_query
+
+LIST_MODELS = [ProjectModel, ModuleTypeModel, ModuleModel, TaskModel, IssueModel]
+ID = "00000000-0000-0000-0000-000000000000"
+
+
+def page_query(list_query):
+    """The first page query list_data and paginate() run for `list_query`."""
+    model = list_query.query.column_descriptions[0]["entity"]
+    query = order_keyset(
+        list_query.query, list_query.sort_column, model.id, list_query.descending
+    )
+    return query.limit(10)
+
+
+def list_shapes(db, all_sorts: bool):
+    for model in LIST_MODELS:
+        sorts = [None, "name"]
+        if all_sorts:
+            sorts = [None] + list(inspect(model).columns.keys())
+        for sort_by in sorts:
+            for order in ["asc", "desc"] if sort_by else ["desc"]:
+                list_query = build_list_query(db, model, sort_by=sort_by, order=order)
+                name = f"list {model.__tablename__} sort_by={sort_by} {order}"
+                yield name, page_query(list_query)
+        list_query = build_list_query(db, model, search="project")
+        yield f"list {model.__tablename__} search", page_query(list_query)
+
+    builders = [
+        ("admin_users", build_admin_users_query, [None, "name", "email"]),
+        ("roles", build_roles_query, [None, "name"]),
+    ]
+    for table, builder, sorts in builders:
+        for sort_by in sorts:
+            for order in ["asc", "desc"] if sort_by else ["desc"]:
+                list_query = builder(db, sort_by=sort_by, order=order)
+                name = f"list {table} sort_by={sort_by} {order}"
+                yield name, page_query(list_query)
+        yield f"list {table} search", page_query(builder(db, search="admin"))
+
+
+def crud_shapes(db):
+    for model in LIST_MODELS + [AdminUserModel, RoleModel]:
+        yield f"get {model.__tablename__} by id", db.query(model).filter_by(
+            id=ID, is_deleted=False
+        )
+    yield "admin user by email", db.query(AdminUserModel).filter(
+        AdminUserModel.email == "admin@example.com",
+        AdminUserModel.is_deleted == False,
+    )
+    yield "role of admin user", db.query(RoleModel).join(AdminUserRoleModel).filter(
+        AdminUserRoleModel.admin_user_id == ID
+    )
+    yield "operations of role", db.query(RoleOperationModel).filter(
+        RoleOperationModel.role_id == ID
+    )
+    yield "operation tree", db.query(OperationModel).order_by(
+        OperationModel.order_index
+    )
+    yield "active otp", db.query(AdminUserOtpModel).filter(
+        AdminUserOtpModel.admin_user_id == ID,
+        AdminUserOtpModel.created_at > datetime(2024, 1, 1),
+        AdminUserOtpModel.is_redeemed == False,
+    ).order_by(AdminUserOtpModel.created_at.desc())
+    yield "pending outbox emails", db.query(EmailOutboxModel).filter(
+        EmailOutboxModel.status == EmailStatusEnum.PENDING,
+        EmailOutboxModel.next_attempt_at <= datetime(2024, 1, 1),
+    ).order_by(EmailOutboxModel.next_attempt_at)
+    yield "users of project", db.query(ProjectUserModel).filter(
+        ProjectUserModel.project_id == ID
+    )
+    yield "modules of project", db.query(ModuleModel).filter(
+        ModuleModel.project_id == ID, ModuleModel.is_deleted == False
+    )
+    yield "tasks of module", db.query(TaskModel).filter(
+        TaskModel.module_id == ID, TaskModel.is_deleted == False
+    )
+    yield "issues of task", db.query(IssueModel).filter(
+        IssueModel.task_id == ID, IssueModel.is_deleted == False
+    )
+
+
+def explain(db, query):
+    dialect = db.get_bind().dialect
+    sql = str(
+        query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    )
+    problems = []
+    if dialect.name == "mysql":
+        for row in db.execute(text("EXPLAIN " + sql)).mappings():
+            extra = row["Extra"] or ""
+            if row["type"] == "ALL":
+                problems.append(f"full scan of {row['table']}")
+            if "filesort" in extra:
+                problems.append(f"filesort on {row['table']}")
+    elif dialect.name == "sqlite":
+        for row in db.execute(text("EXPLAIN QUERY PLAN " + sql)):
+            detail = row[-1]
+            if re.match(r"SCAN \w+$", detail):
+                problems.append(f"full scan ({detail})")
+            if "TEMP B-TREE FOR ORDER BY" in detail:
+                problems.append(f"filesort ({detail})")
+    else:
+        raise SystemExit(f"EXPLAIN is not supported for {dialect.name}")
+    return problems
+
+
+def missing_fk_indexes(db):
+    inspector = inspect(db.get_bind())
+    problems = []
+    for table in inspector.get_table_names():
+        indexed = [inspector.get_pk_constraint(table)["constrained_columns"]]
+        indexed += [index["column_names"] for index in inspector.get_indexes(table)]
+        for fk in inspector.get_foreign_keys(table):
+            columns = fk["constrained_columns"]
+            if not any(index[: len(columns)] == columns for index in indexed):
+                problems.append(
+                    f"{table}({', '.join(columns)}) -> {fk['referred_table']}"
+                )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--all-sorts",
+        action="store_true",
+        help="explain list queries sorted by every column, not just the defaults",
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    flagged = 0
+    try:
+        shapes = list(list_shapes(db, all_sorts=args.all_sorts))
+        for name, query in shapes + list(crud_shapes(db)):
+            problems = explain(db, query)
+            flagged += bool(problems)
+            print(f"{'FLAG' if problems else 'ok':<5} {name}")
+            for problem in problems:
+                print(f"      {problem}")
+
+        for problem in missing_fk_indexes(db):
+            flagged += 1
+            print(f"FLAG  foreign key without index {problem}")
+    finally:
+        db.close()
+
+    print(f"\n{flagged} flagged")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
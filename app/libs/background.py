@@ -0,0 +1,29 @@
+import asyncio
+import traceback
+
+from fastapi.concurrency import run_in_threadpool
+
+_tasks = []
+
+
+async def _run_periodically(func, interval: float):
+    while True:
+        try:
+            await run_in_threadpool(func)
+        except Exception as e:
+            print(e)
+            print(traceback.format_exc())
+        await asyncio.sleep(interval)
+
+
+def start_periodic(func, interval: float):
+    """Run a blocking `func` every `interval` seconds off the event loop."""
+    task = asyncio.get_running_loop().create_task(_run_periodically(func, interval))
+    _tasks.append(task)
+    return task
+
+
+def stop_all():
+    for task in _tasks:
+        task.cancel()
+    _tasks.clear()
@@ -4,6 +4,11 @@ ADMIN_USER_NOT_FOUND = "Admin user not found."
 
 # Common
 ORDER_BY = "asc | desc"
+CURSOR = "next_cursor from the previous page, replaces start."
+COUNT_MODE = "exact | window | cached | estimated | none"
+COUNT_MODE_PATTERN = "^(exact|window|cached|estimated|none)$"
+EXPORT_FORMAT = "ndjson | csv"
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
 
 # Role
 ROLE_ID = "Role id."
@@ -17,6 +22,12 @@ MODULE_TYPE_NOT_FOUND = "Module type not found."
 PROJECT_ID = "Project id."
 PROJECT_NOT_FOUND = "Project not found."
 
+# Project report
+REPORT_JOB_ID = "Report job id, returned when the report was requested."
+REPORT_JOB_ID_PATTERN = "^[0-9a-f-]{36}-[0-9a-f]{16}$"
+REPORT_NOT_FOUND = "Report not found."
+REPORT_NOT_READY = "Report is not ready yet."
+
 # Module
 MODULE_ID = "Module id."
 MODULE_NOT_FOUND = "Module not found."
@@ -0,0 +1,106 @@
+from typing import Optional
+
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+
+from app.config import COUNT_CACHE_SIZE, COUNT_CACHE_TTL
+from app.libs.cache import TTLCache
+
+# exact     - SELECT COUNT(*) over the filtered query
+# window    - COUNT(*) OVER () on the page query itself, one round-trip
+# cached    - exact count cached per (table, filter) until this process writes
+#             the table, or for the cache TTL after another process does
+# estimated - table statistics less soft-deleted rows for unfiltered lists,
+#             exact otherwise
+# none      - no count, for clients paging with cursors
+COUNT_MODES = ("exact", "window", "cached", "estimated", "none")
+
+count_cache = TTLCache(maxsize=COUNT_CACHE_SIZE, ttl=COUNT_CACHE_TTL)
+
+# Called with the table name after every commit of this process that wrote to
+# that table
+table_write_listeners = [count_cache.invalidate_tag]
+
+
+def on_table_written(func):
+    table_write_listeners.append(func)
+    return func
+
+
+def _written_tables(session: Session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    tables = _written_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(state):
+    # Bulk query.update()/delete() and Core inserts skip the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _written_tables(state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_table_writes(session):
+    for table in session.info.pop("written_tables", ()):
+        for listener in table_write_listeners:
+            listener(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+def query_table(query) -> str:
+    return query.column_descriptions[0]["entity"].__tablename__
+
+
+def cached_count(query) -> int:
+    statement = query.statement.compile()
+    key = (str(statement), tuple(sorted(statement.params.items(), key=str)))
+    count = count_cache.get(key)
+    if count is None:
+        table = query_table(query)
+        # Not stored if a write to the table commits while counting
+        generation = count_cache.generation(table)
+        count = query.count()
+        count_cache.set(key, count, tag=table, generation=generation)
+    return count
+
+
+def estimated_count(query) -> Optional[int]:
+    """Live row estimate from the table statistics, None when unavailable.
+
+    TABLE_ROWS counts soft-deleted rows too, which no list shows, so their
+    count is taken off. It is a cached range scan of the is_deleted index,
+    cheap while deleted rows are a small share of the table, and like any
+    cached count up to the cache TTL behind deletes made by other processes.
+    """
+    if query.session.get_bind().dialect.name != "mysql":
+        return None
+    rows = query.session.execute(
+        text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": query_table(query)},
+    ).scalar()
+    model = query.column_descriptions[0]["entity"]
+    if rows is not None and hasattr(model, "is_deleted"):
+        deleted = query.session.query(model).filter(model.is_deleted == True)
+        rows = max(rows - cached_count(deleted), 0)
+    return rows
+
+
+def window_count_column():
+    return func.count().over().label("total_count")
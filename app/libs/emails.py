@@ -1,29 +1,87 @@
 import smtplib
+import threading
+from email.message import EmailMessage
 
 import boto3
+from botocore.config import Config
 
-from app.config import SES_FROM_EMAIL
+from app.config import EMAIL_BACKEND, SES_FROM_EMAIL, SMTP_HOST, SMTP_PORT
+
+_lock = threading.Lock()
+_ses_client = None
+_smtp = None
+
+
+def get_ses_client():
+    # boto3 clients are thread safe, one client keeps its connection pool
+    global _ses_client
+    if _ses_client is None:
+        with _lock:
+            if _ses_client is None:
+                session = boto3.Session()
+                _ses_client = session.client(
+                    "ses",
+                    config=Config(
+                        max_pool_connections=10,
+                        connect_timeout=5,
+                        read_timeout=10,
+                        retries={"max_attempts": 2},
+                    ),
+                )
+    return _ses_client
+
+
+def _send_ses(recipients, subject, body):
+    get_ses_client().send_email(
+        Source=SES_FROM_EMAIL,
+        Destination={
+            "ToAddresses": recipients,
+        },
+        Message={
+            "Subject": {"Data": subject, "Charset": "UTF-8"},
+            "Body": {
+                "Html": {"Data": body, "Charset": "UTF-8"},
+            },
+        },
+        ReplyToAddresses=[
+            SES_FROM_EMAIL,
+        ],
+    )
+
+
+def _send_smtp(recipients, subject, body):
+    global _smtp
+    message = EmailMessage()
+    message["From"] = SES_FROM_EMAIL or "no-reply@localhost"
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+
+    with _lock:
+        # Reuse the connection, reconnecting once if the server dropped it
+        for attempt in range(2):
+            try:
+                if _smtp is None:
+                    _smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+                _smtp.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                _smtp = None
+                if attempt:
+                    raise
+
+
+def deliver_email(recipients, subject, body):
+    """Send an email with the configured backend, raising on failure."""
+    if EMAIL_BACKEND == "smtp":
+        _send_smtp(recipients, subject, body)
+    else:
+        _send_ses(recipients, subject, body)
 
 
 def send_email(recipients, subject, body):
-    session = boto3.Session()
-    client = session.client("ses")
     try:
-        client.send_email(
-            Source=SES_FROM_EMAIL,
-            Destination={
-                "ToAddresses": recipients,
-            },
-            Message={
-                "Subject": {"Data": subject, "Charset": "UTF-8"},
-                "Body": {
-                    "Html": {"Data": body, "Charset": "UTF-8"},
-                },
-            },
-            ReplyToAddresses=[
-                SES_FROM_EMAIL,
-            ],
-        )
+        deliver_email(recipients, subject, body)
     except Exception as e:
         print(e)
         return False
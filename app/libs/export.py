@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from typing import Optional
+
+from app.config import EXPORT_BATCH_SIZE
+from app.database import SessionLocal
+from app.libs.utils import build_list_query, eager_options, order_keyset
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _flatten(data: dict, prefix: str = ""):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, prefix=f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def export_rows(
+    model,
+    schema,
+    format: str = "ndjson",
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+):
+    """Yield every live row of `model` serialized with `schema`.
+
+    Rows are read from a server-side cursor `batch_size` at a time and
+    written out per batch, so memory does not grow with the table. The
+    export uses its own session since it outlives the request handler.
+    """
+    db = SessionLocal()
+    try:
+        list_query = build_list_query(
+            db, model, sort_by=sort_by, order=order, search=search
+        )
+        query = order_keyset(
+            list_query.query.options(*eager_options(model, schema)),
+            list_query.sort_column,
+            model.id,
+            list_query.descending,
+        )
+
+        buffer = io.StringIO()
+        writer = None
+        for count, row in enumerate(query.yield_per(batch_size), start=1):
+            data = schema.model_validate(row, from_attributes=True)
+            data = data.model_dump(mode="json")
+            if format == "csv":
+                data = dict(_flatten(data))
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(data))
+                    writer.writeheader()
+                writer.writerow(data)
+            else:
+                buffer.write(json.dumps(data, separators=(",", ":")))
+                buffer.write("\n")
+
+            if count % batch_size == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
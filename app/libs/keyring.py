@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from jwcrypto import jwk
+from jwcrypto.common import base64url_decode
+
+from app.config import (
+    JWT_ACTIVE_KID,
+    JWT_KEY,
+    JWT_KEYS,
+    JWT_KEYS_FILE,
+    KEY_RING_RELOAD_INTERVAL,
+)
+
+
+class KeyRing:
+    """Pre-parsed signing keys indexed by `kid`.
+
+    The active key signs new tokens, every other key in the ring is still
+    accepted for verification so keys can overlap while rotating.
+    """
+
+    def __init__(self, keys: Dict[str, jwk.JWK], active_kid: str, version: int):
+        if active_kid not in keys:
+            raise ValueError(f"Active key '{active_kid}' is not in the key ring")
+        self.keys = keys
+        self.active_kid = active_kid
+        self.version = version
+
+    def signing_key(self):
+        return self.active_kid, self.keys[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[jwk.JWK]:
+        if kid is None:
+            # Tokens issued before the key ring existed carry no kid
+            kid = LEGACY_KID
+        return self.keys.get(kid)
+
+
+LEGACY_KID = "legacy"
+
+_lock = threading.Lock()
+_key_ring: Optional[KeyRing] = None
+_keys_file_mtime: Optional[float] = None
+_checked_at = 0.0
+
+
+def parse_keys(data) -> Dict[str, jwk.JWK]:
+    if isinstance(data, str):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = data.get("keys", [])
+
+    keys = {}
+    for key_data in data:
+        key = jwk.JWK(**key_data)
+        kid = key_data.get("kid") or key.thumbprint()
+        keys[kid] = key
+    return keys
+
+
+def build_key_ring(version: int = 1) -> KeyRing:
+    keys = {}
+    if JWT_KEY:
+        keys[LEGACY_KID] = jwk.JWK(**JWT_KEY)
+    if JWT_KEYS:
+        keys.update(parse_keys(JWT_KEYS))
+    if JWT_KEYS_FILE:
+        with open(JWT_KEYS_FILE) as f:
+            keys.update(parse_keys(f.read()))
+
+    active_kid = JWT_ACTIVE_KID
+    if not active_kid:
+        # Prefer the newest configured key over the legacy one
+        active_kid = list(keys)[-1]
+    return KeyRing(keys=keys, active_kid=active_kid, version=version)
+
+
+def _get_keys_file_mtime():
+    if not JWT_KEYS_FILE:
+        return None
+    try:
+        return os.stat(JWT_KEYS_FILE).st_mtime
+    except OSError as e:
+        print(e)
+        return None
+
+
+def reload_key_ring() -> KeyRing:
+    global _key_ring, _keys_file_mtime
+    with _lock:
+        version = _key_ring.version + 1 if _key_ring else 1
+        # Recorded even if the file turns out broken, so it is not parsed
+        # again on every request until it changes
+        _keys_file_mtime = _get_keys_file_mtime()
+        try:
+            _key_ring = build_key_ring(version=version)
+        except Exception as e:
+            if _key_ring is None:
+                raise
+            # A bad rotation must not take authentication down, keep the
+            # keys we have
+            print(e)
+            print(traceback.format_exc())
+        return _key_ring
+
+
+def get_key_ring() -> KeyRing:
+    global _checked_at
+    if _key_ring is None:
+        return reload_key_ring()
+
+    # Pick up a rotated keys file without a restart, stat-ing it at most
+    # once per reload interval
+    if JWT_KEYS_FILE and time.monotonic() - _checked_at > KEY_RING_RELOAD_INTERVAL:
+        _checked_at = time.monotonic()
+        mtime = _get_keys_file_mtime()
+        if mtime is not None and mtime != _keys_file_mtime:
+            return reload_key_ring()
+    return _key_ring
+
+
+def get_token_kid(token: str) -> Optional[str]:
+    header = token.split(".", 1)[0]
+    header = json.loads(base64url_decode(header))
+    return header.get("kid")
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_WORKERS
+
+# bcrypt gets its own small pool so a burst of logins can only ever hold
+# workers + queue size request threads, everything beyond that is rejected
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+_lock = threading.Lock()
+_metrics = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "rejected": 0,
+    "hash_seconds_total": 0.0,
+    "hash_seconds_max": 0.0,
+}
+
+
+def _timed(func, *args):
+    with _lock:
+        _metrics["queued"] -= 1
+        _metrics["running"] += 1
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _metrics["running"] -= 1
+            _metrics["completed"] += 1
+            _metrics["hash_seconds_total"] += elapsed
+            _metrics["hash_seconds_max"] = max(_metrics["hash_seconds_max"], elapsed)
+
+
+def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        with _lock:
+            _metrics["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again.",
+        )
+    try:
+        with _lock:
+            _metrics["queued"] += 1
+        return _executor.submit(_timed, func, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str) -> str:
+    password = password.encode("utf-8")
+    hashed = _run(bcrypt.hashpw, password, bcrypt.gensalt(4))
+    return hashed.decode("utf-8")
+
+
+def check_password(password: str, hashed: str) -> bool:
+    return _run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def stats():
+    with _lock:
+        completed = _metrics["completed"]
+        data = dict(_metrics)
+    data["workers"] = PASSWORD_HASH_WORKERS
+    data["queue_size"] = PASSWORD_HASH_QUEUE_SIZE
+    data["hash_seconds_avg"] = (
+        data["hash_seconds_total"] / completed if completed else 0.0
+    )
+    return data
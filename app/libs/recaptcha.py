@@ -1,29 +1,129 @@
-import json
+import threading
+import time
 
-import requests
+import httpx
 from fastapi import HTTPException, status
 
-from app.config import RE_CAPTCHA_SECRET
-
-
-def verify_captcha(captcha_token: str):
-    url = "https://www.google.com/recaptcha/api/siteverify"
-    multipart_form_data = {
-        "secret": (None, RE_CAPTCHA_SECRET),
-        "response": (None, captcha_token),
-    }
-    response = requests.post(url, files=multipart_form_data)
-    if response.status_code == 200:
-        data = json.loads(response.text)
-        if data["success"] == False:
-            print(data)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Captcha verification failed.",
-            )
-    else:
-        print(response.status_code, response.text)
+from app.config import (
+    RE_CAPTCHA_BREAKER_RESET,
+    RE_CAPTCHA_BREAKER_THRESHOLD,
+    RE_CAPTCHA_ENABLED,
+    RE_CAPTCHA_FAIL_OPEN,
+    RE_CAPTCHA_SECRET,
+    RE_CAPTCHA_TIMEOUT,
+    RE_CAPTCHA_URL,
+)
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for `reset_timeout` seconds.
+
+    After `failure_threshold` consecutive failures the breaker opens, once the
+    timeout has passed a single trial call is let through (half open) and its
+    result closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                # Let one trial through, the rest wait for its outcome
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures}
+
+
+breaker = CircuitBreaker(
+    failure_threshold=RE_CAPTCHA_BREAKER_THRESHOLD,
+    reset_timeout=RE_CAPTCHA_BREAKER_RESET,
+)
+
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # One keep-alive client per process, created on the running event loop
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(RE_CAPTCHA_TIMEOUT),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _unavailable():
+    if RE_CAPTCHA_FAIL_OPEN:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Captcha verification is unavailable, please try again.",
+    )
+
+
+async def verify_captcha(captcha_token: str):
+    if not RE_CAPTCHA_ENABLED:
+        return
+    if not captcha_token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Captcha verification failed.",
+        )
+    if not breaker.allow():
+        return _unavailable()
+
+    try:
+        response = await get_client().post(
+            RE_CAPTCHA_URL,
+            data={"secret": RE_CAPTCHA_SECRET, "response": captcha_token},
+        )
+        response.raise_for_status()
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        print(e)
+        breaker.record_failure()
+        return _unavailable()
+    breaker.record_success()
+
+    if not data.get("success"):
+        print(data)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Unable to create user.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Captcha verification failed.",
         )
@@ -0,0 +1,170 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from fpdf import FPDF
+
+from app.config import REPORT_DIR, REPORT_JOB_TTL, REPORT_WORKERS
+from app.libs.cache import TTLCache
+
+# job id -> {"status": pending | done | failed, "error": ...}
+jobs = TTLCache(maxsize=10000, ttl=REPORT_JOB_TTL)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    # Created on first use and with spawn, forking a process that already
+    # runs the event loop and database pool threads is not safe
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=REPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_executor(executor=None):
+    """Stop the pool, or only `executor` if it is still the current one."""
+    global _executor
+    with _lock:
+        if _executor is not None and executor in (None, _executor):
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def data_version(data: dict) -> str:
+    """Hash of everything the report shows, changes whenever the PDF would."""
+    data = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def report_path(job_id: str) -> str:
+    return os.path.join(REPORT_DIR, f"{job_id}.pdf")
+
+
+def _text(value) -> str:
+    # The core fpdf fonts only cover latin-1
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def _table(pdf: FPDF, header: list, rows: list, widths: list):
+    pdf.set_font("Arial", "B", 10)
+    for title, width in zip(header, widths):
+        pdf.cell(width, 7, _text(title), border=1)
+    pdf.ln()
+    pdf.set_font("Arial", "", 10)
+    for row in rows:
+        for value, width in zip(row, widths):
+            pdf.cell(width, 7, _text(value), border=1)
+        pdf.ln()
+    pdf.ln(4)
+
+
+def render_report(path: str, project_id: str, data: dict) -> str:
+    """Write the report PDF to `path`. Runs in a worker process."""
+    summary = data["summary"]
+    project = data["project"]
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, _text(f"Project report: {project['name']}"), ln=1)
+    pdf.set_font("Arial", "", 10)
+    for label, value in (
+        ("Status", project["status"]),
+        ("Dates", f"{project['start_date']} - {project['end_date']}"),
+        ("Manager", project["manager"]),
+        ("Generated", datetime.now().strftime("%Y-%m-%d %H:%M")),
+    ):
+        pdf.cell(0, 6, _text(f"{label}: {value}"), ln=1)
+    pdf.ln(4)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, _text(f"Modules: {summary['modules']}"), ln=1)
+    statuses = list(summary["tasks"])
+    _table(pdf, statuses, [[summary["tasks"][name] for name in statuses]], [40] * 3)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Open issues by priority", ln=1)
+    open_issues = summary["issues"]["OPEN"]
+    priorities = list(open_issues)
+    _table(pdf, priorities, [[open_issues[name] for name in priorities]], [40] * 3)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Tasks per module", ln=1)
+    _table(
+        pdf,
+        ["Module"] + statuses + ["Open issues"],
+        [
+            [module["name"]]
+            + [module["tasks"][name] for name in statuses]
+            + [module["open_issues"]]
+            for module in data["modules"]
+        ],
+        [70, 28, 28, 28, 28],
+    )
+
+    # Written next to the final name first so a half written file is never
+    # served, then older versions of this project's report are removed
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pdf.output(path + ".tmp", "F")
+    os.replace(path + ".tmp", path)
+    for old in glob.glob(os.path.join(os.path.dirname(path), f"{project_id}-*.pdf")):
+        if old != path:
+            os.remove(old)
+    return path
+
+
+def _finish(job_id: str, future):
+    try:
+        future.result()
+        jobs.set(job_id, {"status": "done", "error": None})
+    except Exception as e:
+        print(e)
+        print(traceback.format_exc())
+        jobs.set(job_id, {"status": "failed", "error": "Report generation failed."})
+
+
+def submit_report(project_id: str, data: dict) -> str:
+    """Queue the report of `data`, unless that version is rendered or queued.
+
+    The job id is the project id plus the data version, which is also the
+    file name, so any worker process can serve a finished report.
+    """
+    job_id = f"{project_id}-{data_version(data)}"
+    path = report_path(job_id)
+    if os.path.exists(path):
+        jobs.set(job_id, {"status": "done", "error": None})
+        return job_id
+    job = jobs.get(job_id)
+    if job is not None and job["status"] == "pending":
+        return job_id
+
+    jobs.set(job_id, {"status": "pending", "error": None})
+    executor = get_executor()
+    try:
+        future = executor.submit(render_report, path, project_id, data)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory), start a fresh pool
+        shutdown_executor(executor)
+        future = get_executor().submit(render_report, path, project_id, data)
+    future.add_done_callback(lambda future: _finish(job_id, future))
+    return job_id
+
+
+def get_job(job_id: str):
+    """Status of `job_id`, None when it is unknown to this process and has no file."""
+    if os.path.exists(report_path(job_id)):
+        return {"status": "done", "error": None}
+    return jobs.get(job_id)
@@ -0,0 +1,100 @@
+import re
+import threading
+from typing import Optional
+
+from sqlalchemy import String, inspect
+from sqlalchemy.dialects.mysql import match
+
+from app.libs.counts import on_table_written
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: Optional[str]):
+    if not value:
+        return []
+    return TOKEN_RE.findall(value.lower())
+
+
+def searchable_columns(model):
+    """Text columns named in the model's `__searchable__`.
+
+    Models without the declaration fall back to all their string columns.
+    """
+    names = getattr(model, "__searchable__", None)
+    if names is None:
+        names = [
+            column.key
+            for column in inspect(model).columns
+            if isinstance(column.type, String) and column.key != "id"
+        ]
+    return [getattr(model, name) for name in names]
+
+
+class InvertedIndex:
+    """In-process token -> ids index of the searchable columns.
+
+    Used where the database has no FULLTEXT support (SQLite runs). Built
+    on the first search of a table and dropped whenever the table is written.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, table: str):
+        with self._lock:
+            self._tables.pop(table, None)
+
+    def build(self, db, model):
+        index = {}
+        columns = searchable_columns(model)
+        rows = db.query(model.id, *columns).filter(model.is_deleted == False)
+        for row in rows.yield_per(1000):
+            for value in row[1:]:
+                for token in tokenize(value):
+                    index.setdefault(token, set()).add(row[0])
+        with self._lock:
+            self._tables[model.__tablename__] = index
+        return index
+
+    def lookup(self, db, model, terms) -> set:
+        index = self._tables.get(model.__tablename__)
+        if index is None:
+            index = self.build(db, model)
+
+        ids = None
+        for term in terms:
+            # Prefix match like the `term*` boolean mode operator
+            matches = set()
+            for token, token_ids in index.items():
+                if token.startswith(term):
+                    matches |= token_ids
+            ids = matches if ids is None else ids & matches
+            if not ids:
+                break
+        return ids or set()
+
+
+search_index = InvertedIndex()
+on_table_written(search_index.invalidate)
+
+
+def apply_search(db, query, model, search: str):
+    """Filter `query` to rows matching every term of `search`.
+
+    Returns (query, relevance), relevance is a MATCH ... AGAINST expression
+    to rank by on MySQL and None on the fallback index.
+    """
+    terms = tokenize(search)
+    if not terms:
+        return query, None
+
+    if db.get_bind().dialect.name == "mysql":
+        against = " ".join(f"+{term}*" for term in terms)
+        relevance = match(*searchable_columns(model), against=against)
+        relevance = relevance.in_boolean_mode()
+        return query.filter(relevance), relevance
+
+    ids = search_index.lookup(db, model, terms)
+    return query.filter(model.id.in_(ids)), None
@@ -0,0 +1,71 @@
+import json
+
+from jwcrypto import jwt
+from jwcrypto.common import JWException
+
+from app.config import TOKEN_PROFILE
+from app.libs.keyring import get_key_ring, get_token_kid
+
+# nested    - HS256 JWS wrapped in an A256KW/A256CBC-HS512 JWE (original format)
+# signed    - compact HS256 JWS only, claims are readable but tamper proof
+# encrypted - single A256KW/A256CBC-HS512 JWE around the plain claims
+TOKEN_PROFILES = ("nested", "signed", "encrypted")
+
+JWS_ALGS = ["HS256"]
+JWE_ALGS = ["A256KW", "A256CBC-HS512"]
+
+
+def _sign(claims, kid, key) -> str:
+    token = jwt.JWT(header={"alg": "HS256", "kid": kid}, claims=claims)
+    token.make_signed_token(key)
+    return token.serialize()
+
+
+def _encrypt(claims, kid, key) -> str:
+    token = jwt.JWT(
+        header={"alg": "A256KW", "enc": "A256CBC-HS512", "kid": kid}, claims=claims
+    )
+    token.make_encrypted_token(key)
+    return token.serialize()
+
+
+def issue_token(claims: dict, profile: str = TOKEN_PROFILE) -> str:
+    kid, key = get_key_ring().signing_key()
+    if profile == "signed":
+        return _sign(claims, kid, key)
+    elif profile == "encrypted":
+        return _encrypt(claims, kid, key)
+    elif profile == "nested":
+        return _encrypt(_sign(claims, kid, key), kid, key)
+    raise ValueError(f"Unknown token profile '{profile}'")
+
+
+def decode_token(token: str) -> dict:
+    """Verify a token of any profile and return its claims.
+
+    The profile is detected from the token itself so tokens issued under a
+    previous profile stay valid while migrating. Raises ValueError for
+    anything that does not verify.
+    """
+    key = get_key_ring().verification_key(get_token_kid(token))
+    if key is None:
+        raise ValueError("Unknown key id")
+
+    try:
+        # Compact JWS has 3 segments, compact JWE has 5
+        if token.count(".") == 2:
+            payload = jwt.JWT(
+                key=key, jwt=token, algs=JWS_ALGS, expected_type="JWS"
+            ).claims
+        else:
+            payload = jwt.JWT(
+                key=key, jwt=token, algs=JWE_ALGS, expected_type="JWE"
+            ).claims
+            if not payload.startswith("{"):
+                # Nested token, the decrypted payload is itself a signed token
+                payload = jwt.JWT(
+                    key=key, jwt=payload, algs=JWS_ALGS, expected_type="JWS"
+                ).claims
+    except JWException as e:
+        raise ValueError(str(e)) from e
+    return json.loads(payload)
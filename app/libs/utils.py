@@ -1,22 +1,31 @@
+import base64
+import enum
 import hashlib
+import json
 import os
 import pathlib
 import random
 import traceback
 import urllib.request
-from datetime import datetime
+from collections import namedtuple
+from functools import lru_cache
+from datetime import date, datetime
 from mimetypes import guess_extension
-from typing import Optional
+from typing import Optional, get_args
 from uuid import uuid4
 
 import boto3
+
 # from datauri import DataURI
 # from datauri.exceptions import InvalidDataURI
 from fastapi import HTTPException, status
-from sqlalchemy import desc, inspect, or_
-from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from sqlalchemy import and_, desc, insert, inspect, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.config import BUCKET_NAME
+from app.config import BUCKET_NAME, BULK_MAX_ITEMS, LIST_COUNT_MODE
+from app.libs.counts import cached_count, estimated_count, window_count_column
+from app.libs.search import apply_search
 
 
 def now():
@@ -45,6 +54,15 @@ def date_time_diff_min(start: datetime, end: datetime):
     return minutes
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags
+
+
 def remove_file(path):
     os.remove(path)
 
@@ -92,41 +110,277 @@ def create_hash(key: str) -> str:
 #     return object_name
 
 
-def list_data(
-    db: Session,
-    model,
+def check_bulk_size(items: list):
+    if not 0 < len(items) <= BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Send between 1 and {BULK_MAX_ITEMS} items.",
+        )
+
+
+def existing_ids(db: Session, model, ids) -> set:
+    """The subset of `ids` that are live rows of `model`, in one IN query."""
+    ids = set(ids)
+    if not ids:
+        return set()
+    rows = db.query(model.id).filter(model.id.in_(ids), model.is_deleted == False)
+    return {id for (id,) in rows}
+
+
+def insert_ignore(model):
+    """INSERT that skips rows already covered by a unique constraint."""
+    return (
+        insert(model)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+
+def _schema_of(annotation):
+    # Unwrap Optional[X] / List[X] down to the nested response model
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = _schema_of(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+@lru_cache(maxsize=None)
+def eager_options(model, schema) -> tuple:
+    """Loader options for every relationship `schema` serializes.
+
+    Many-to-one relationships are joined into the query, collections are
+    loaded with one extra SELECT ... IN per relationship, nested schemas
+    recurse. Without them every row lazy loads each relationship while
+    the response is serialized.
+    """
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in schema.model_fields.items():
+        relationship = relationships.get(name)
+        if relationship is None:
+            continue
+        attribute = getattr(model, name)
+        if relationship.uselist:
+            loader = selectinload(attribute)
+        else:
+            loader = joinedload(attribute)
+        nested = _schema_of(field.annotation)
+        if nested is not None:
+            loader = loader.options(*eager_options(relationship.mapper.class_, nested))
+        options.append(loader)
+    return tuple(options)
+
+
+def encode_cursor(values) -> str:
+    values = [
+        value.value
+        if isinstance(value, enum.Enum)
+        else value.isoformat()
+        if isinstance(value, (date, datetime))
+        else value
+        for value in values
+    ]
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        result = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is None or isinstance(value, python_type):
+                result.append(value)
+            elif python_type in (date, datetime):
+                result.append(python_type.fromisoformat(value))
+            else:
+                result.append(python_type(value))
+        return result
+    except Exception as e:
+        print(e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+
+
+Page = namedtuple("Page", ["list", "next_cursor", "count"])
+
+ListQuery = namedtuple("ListQuery", ["query", "sort_column", "descending", "ranked"])
+
+
+def order_keyset(query, sort_column, id_column, descending: bool):
+    if descending:
+        return query.order_by(desc(sort_column), desc(id_column))
+    return query.order_by(sort_column, id_column)
+
+
+def paginate(
+    query,
+    sort_column,
+    id_column,
+    descending: bool,
     start: int,
     limit: int,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
+    filtered: bool = False,
+) -> Page:
+    """Page through `query` ordered by (sort_column, id_column).
+
+    Without a cursor this is the classic offset/limit page. With a cursor the
+    page starts right after the (sort value, id) it encodes, so every page
+    costs the same as the first one. `count_mode` is one of
+    app.libs.counts.COUNT_MODES, `filtered` tells the estimated mode that
+    table statistics do not apply.
+    """
+    count_mode = count_mode or LIST_COUNT_MODE
+    count = None
+    if count_mode == "estimated" and not filtered:
+        count = estimated_count(query)
+    if count_mode == "window" and cursor:
+        # Behind a cursor the window would only see the remaining rows
+        count_mode = "exact"
+    if count_mode in ("exact", "estimated") and count is None:
+        count = query.count()
+    elif count_mode == "cached":
+        count = cached_count(query)
+
+    base_query = query
+    if count_mode == "window":
+        query = query.add_columns(window_count_column())
+
+    query = order_keyset(query, sort_column, id_column, descending)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, [sort_column, id_column])
+        # NULLs sort first ascending and last descending (MySQL and SQLite)
+        if value is None:
+            if descending:
+                query = query.filter(sort_column.is_(None), id_column < last_id)
+            else:
+                query = query.filter(
+                    or_(
+                        sort_column.isnot(None),
+                        and_(sort_column.is_(None), id_column > last_id),
+                    )
+                )
+        elif descending:
+            query = query.filter(
+                or_(
+                    sort_column < value,
+                    and_(sort_column == value, id_column < last_id),
+                    sort_column.is_(None),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > value,
+                    and_(sort_column == value, id_column > last_id),
+                )
+            )
+    else:
+        query = query.offset(start)
+
+    # One extra row tells whether there is a next page
+    results = query.limit(limit + 1).all()
+    if count_mode == "window":
+        if results:
+            count = results[0].total_count
+        elif start:
+            # Past the last page there is no row to carry the total
+            count = base_query.count()
+        else:
+            count = 0
+        results = [row[0] for row in results]
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        # A zero limit page has no last row to continue after
+        if limit > 0:
+            last = results[-1]
+            next_cursor = encode_cursor(
+                [getattr(last, sort_column.key), getattr(last, id_column.key)]
+            )
+    return Page(list=results, next_cursor=next_cursor, count=count)
+
+
+def build_list_query(
+    db: Session,
+    model,
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
-):
+) -> ListQuery:
+    """The filtered query and sort list_data pages through.
+
+    Also used by app.index_advisor so the advisor explains exactly the
+    queries the list endpoints run.
+    """
     # Create the base query
     query = db.query(model).filter(model.is_deleted == False)
 
-    # Apply search filters if a search term is provided
+    # Full-text search over the model's searchable columns
+    relevance = None
     if search:
-        text = f"%{search}%"
-        columns = inspect(model).columns.keys()
-        # Use dynamic filtering for all string columns
-        text_filters = [getattr(model, col).ilike(text) for col in columns]
-        query = query.filter(or_(*text_filters))
-
-    # Apply sorting if a sort_by parameter is provided
-    if sort_by:
-        column = getattr(model, sort_by, None)
-        if column:
-            if order == "desc":
-                query = query.order_by(desc(column))
-            else:
-                query = query.order_by(column)
+        query, relevance = apply_search(db, query, model, search)
 
-    # If no sort_by parameter is provided, default to sorting by created_at in descending order
+    # Relevance ranked pages have no keyset to continue from, they are paged
+    # with start only
+    ranked = relevance is not None and not sort_by
+    if ranked:
+        query = query.order_by(desc(relevance))
+
+    # Sort by the sort_by column if it is one, otherwise default to
+    # created_at in descending order, id breaks ties for stable pages
+    if sort_by and sort_by in inspect(model).columns.keys():
+        column = getattr(model, sort_by)
+        descending = order == "desc"
     else:
-        query = query.order_by(desc(model.created_at))
+        column = model.created_at
+        descending = True
+    return ListQuery(
+        query=query, sort_column=column, descending=descending, ranked=ranked
+    )
+
 
-    # Execute the query with pagination
-    results = query.offset(start).limit(limit).all()
-    count = query.count()
-    data = {"count": count, "list": results}
+def list_data(
+    db: Session,
+    model,
+    start: int,
+    limit: int,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
+    schema=None,
+):
+    list_query = build_list_query(
+        db, model, sort_by=sort_by, order=order, search=search
+    )
+    query = list_query.query
+    if schema is not None:
+        query = query.options(*eager_options(model, schema))
+    page = paginate(
+        query,
+        sort_column=list_query.sort_column,
+        id_column=model.id,
+        descending=list_query.descending,
+        start=start,
+        limit=limit,
+        cursor=None if list_query.ranked else cursor,
+        count_mode=count_mode,
+        filtered=bool(search),
+    )
+    next_cursor = None if list_query.ranked else page.next_cursor
+    data = {"count": page.count, "list": page.list, "next_cursor": next_cursor}
     return data
@@ -4,7 +4,19 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.config import EMAIL_OUTBOX_INTERVAL, OTP_PURGE_INTERVAL
+from app.database import SessionLocal
+from app.libs.background import start_periodic, stop_all
+from app.libs.keyring import get_key_ring
+from app.libs.recaptcha import close_client
+from app.libs.reports import shutdown_executor
 from app.routers.admin import api as admin
+from app.routers.admin.crud.admin_users.otps import purge_expired_otps
+from app.routers.admin.crud.common.outbox import send_pending_emails
+from app.routers.admin.crud.operations.operations import (
+    operation_tree,
+    permission_matrix,
+)
 
 app = FastAPI(
     title="Project",
@@ -24,6 +36,29 @@ app.add_middleware(
 app.include_router(admin.router)
 
 
+@app.on_event("startup")
+def startup():
+    # Parse signing keys once instead of on the first request
+    get_key_ring()
+
+    db = SessionLocal()
+    try:
+        permission_matrix.load(db)
+        operation_tree.load(db)
+    finally:
+        db.close()
+
+    start_periodic(purge_expired_otps, interval=OTP_PURGE_INTERVAL)
+    start_periodic(send_pending_emails, interval=EMAIL_OUTBOX_INTERVAL)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_all()
+    shutdown_executor()
+    await close_client()
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     try:
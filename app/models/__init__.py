@@ -0,0 +1,17 @@
+from app.models.auth import (
+    AdminUserModel,
+    AdminUserOtpModel,
+    AdminUserRoleModel,
+    OperationModel,
+    RoleModel,
+    RoleOperationModel,
+)
+from app.models.emails import EmailOutboxModel, EmailStatusEnum
+from app.models.projects import (
+    ProjectModel,
+    ProjectStatusCounterModel,
+    ProjectUserModel,
+)
+from app.models.modules import ModuleModel, ModuleTypeModel
+from app.models.tasks import TaskModel
+from app.models.issues import IssueModel, IssueStatusEnum, IssueUserModel
@@ -1 +1 @@
-from .models import AdminUserModel, AdminUserRoleModel, AdminUserOtpModel, OperationModel, RoleModel
+from .models import AdminUserModel, AdminUserRoleModel, AdminUserOtpModel, OperationModel, RoleModel, RoleOperationModel
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class AdminUserModel(Base):
     __tablename__ = "admin_users"
+    __table_args__ = (
+        Index(
+            "ix_admin_users_is_deleted_created_at_id", "is_deleted", "created_at", "id"
+        ),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(100), nullable=False)
@@ -37,8 +42,18 @@ class AdminUserOtpModel(Base):
 
     admin_user = relationship("AdminUserModel", backref="otps")
 
+    __table_args__ = (
+        Index(
+            "ix_admin_user_otps_admin_user_id_created_at", "admin_user_id", "created_at"
+        ),
+        Index("ix_admin_user_otps_created_at", "created_at"),
+    )
+
 class RoleModel(Base):
     __tablename__ = "roles"
+    __table_args__ = (
+        Index("ix_roles_is_deleted_updated_at_id", "is_deleted", "updated_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     slug = Column(String(50), nullable=False)
@@ -0,0 +1,38 @@
+import enum
+from sqlalchemy import Column, String, DateTime, Enum, Index, Integer, Text
+from datetime import datetime
+from app.database import Base
+
+class EmailStatusEnum(enum.Enum):
+    """
+    PENDING
+    SENT
+    DEAD
+
+    """
+
+    PENDING = "PENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
+
+class EmailOutboxModel(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(String(36), primary_key=True)
+    recipients = Column(String(1000), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(
+        Enum(EmailStatusEnum), nullable=False, default=EmailStatusEnum.PENDING
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    last_error = Column(String(1000), nullable=True)
+    # Set by the worker that claimed the row until it records the result
+    lease_id = Column(String(36), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
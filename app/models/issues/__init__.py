@@ -1 +1 @@
-from .models import IssueModel
+from .models import IssueModel, IssueStatusEnum, IssueUserModel
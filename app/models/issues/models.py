@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -29,11 +29,16 @@ class IssuePriorityEnum(enum.Enum):
     
 class IssueModel(Base):
     __tablename__ = "issues"
+    __searchable__ = ["name", "description"]
+    __table_args__ = (
+        Index("ix_issues_fulltext", "name", "description", mysql_prefix="FULLTEXT"),
+        Index("ix_issues_is_deleted_created_at_id", "is_deleted", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(50), nullable=False)
     description = Column(String(255), nullable=True)
-    image = Column(String(255), nullable=False)
+    image = Column(String(255), nullable=False, default="")
     status = Column(Enum(IssueStatusEnum), nullable=False, default=IssueStatusEnum.OPEN)
     priority = Column(
         Enum(IssuePriorityEnum), nullable=False, default=IssuePriorityEnum.LOW
@@ -43,4 +48,21 @@ class IssueModel(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     updated_at = Column(DateTime, nullable=False, default=datetime.now)
 
-    task = relationship("TaskModel", backref="issue")
\ No newline at end of file
+    task = relationship("TaskModel", backref="issue")
+
+class IssueUserModel(Base):
+    __tablename__ = "issue_users"
+    __table_args__ = (
+        UniqueConstraint(
+            "issue_id", "admin_user_id", name="uq_issue_users_issue_id_admin_user_id"
+        ),
+    )
+
+    id = Column(String(36), primary_key=True)
+    issue_id = Column(String(36), ForeignKey("issues.id"), nullable=False)
+    admin_user_id = Column(String(36), ForeignKey("admin_users.id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    issue = relationship("IssueModel", backref="issue_user")
+    admin_user = relationship("AdminUserModel", backref="issue_user")
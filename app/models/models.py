@@ -1,5 +1,7 @@
 from app.models.auth import AdminUserModel, AdminUserRoleModel, AdminUserOtpModel
-from app.models.projects import ProjectModel, ProjectUserModel
+from app.models.projects import ProjectModel, ProjectStatusCounterModel, ProjectUserModel
+from app.models.modules import ModuleModel, ModuleTypeModel
 from app.models.tasks import TaskModel
-from app.models.issues import IssueModel
+from app.models.issues import IssueModel, IssueUserModel
+from app.models.emails import EmailOutboxModel
 from app.database import Base
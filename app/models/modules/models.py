@@ -1,11 +1,18 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
-from app.models.models import ProjectModel
+from app.models.projects.models import ProjectModel
 
 class ModuleTypeModel(Base):
     __tablename__ = "module_types"
+    __searchable__ = ["name"]
+    __table_args__ = (
+        Index("ix_module_types_fulltext", "name", mysql_prefix="FULLTEXT"),
+        Index(
+            "ix_module_types_is_deleted_created_at_id", "is_deleted", "created_at", "id"
+        ),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(50), nullable=False)
@@ -16,6 +23,11 @@ class ModuleTypeModel(Base):
 
 class ModuleModel(Base):
     __tablename__ = "modules"
+    __searchable__ = ["name", "description"]
+    __table_args__ = (
+        Index("ix_modules_fulltext", "name", "description", mysql_prefix="FULLTEXT"),
+        Index("ix_modules_is_deleted_created_at_id", "is_deleted", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(50), nullable=False)
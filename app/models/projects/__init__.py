@@ -1 +1 @@
-from .models import ProjectModel, ProjectUserModel
+from .models import ProjectModel, ProjectStatusCounterModel, ProjectUserModel
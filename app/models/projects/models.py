@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Enum, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -22,6 +22,11 @@ class ProjectStatusEnum(enum.Enum):
 
 class ProjectModel(Base):
     __tablename__ = "projects"
+    __searchable__ = ["name", "description"]
+    __table_args__ = (
+        Index("ix_projects_fulltext", "name", "description", mysql_prefix="FULLTEXT"),
+        Index("ix_projects_is_deleted_created_at_id", "is_deleted", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(50), nullable=False)
@@ -38,6 +43,11 @@ class ProjectModel(Base):
 
 class ProjectUserModel(Base):
     __tablename__ = "project_users"
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id", "admin_user_id", name="uq_project_users_project_id_admin_user_id"
+        ),
+    )
 
     id = Column(String(36), primary_key=True)
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
@@ -47,3 +57,20 @@ class ProjectUserModel(Base):
 
     project = relationship("ProjectModel", backref="project_user")
     admin_user = relationship("AdminUserModel", backref="project_user")
+
+class ProjectStatusCounterModel(Base):
+    """Live rows per module and kind/status/priority, see crud/common/counters.py.
+
+    kind is module, task or issue. status and priority are the enum names,
+    empty where they do not apply, so they can be part of the primary key.
+    """
+
+    __tablename__ = "project_status_counters"
+
+    module_id = Column(String(36), ForeignKey("modules.id"), primary_key=True)
+    kind = Column(String(10), primary_key=True)
+    status = Column(String(20), primary_key=True, default="")
+    priority = Column(String(20), primary_key=True, default="")
+    project_id = Column(String(36), ForeignKey("projects.id"), nullable=False, index=True)
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
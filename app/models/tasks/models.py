@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -19,6 +19,11 @@ class TaskStatusEnum(enum.Enum):
     
 class TaskModel(Base):
     __tablename__ = "tasks"
+    __searchable__ = ["name", "description"]
+    __table_args__ = (
+        Index("ix_tasks_fulltext", "name", "description", mysql_prefix="FULLTEXT"),
+        Index("ix_tasks_is_deleted_created_at_id", "is_deleted", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(50), nullable=False)
@@ -0,0 +1,72 @@
+"""Rebuild project_status_counters from the tasks and issues tables.
+
+python -m app.rebuild_counters [--chunk-size N]
+
+Projects are processed in chunks of N (default 100), each chunk in its own
+transaction: its counters are deleted and recounted from scratch. Run it
+after the counters migration and whenever the counters are suspected to
+have drifted.
+"""
+import argparse
+
+from sqlalchemy import or_
+
+from app.database import SessionLocal
+from app.models import ModuleModel, ProjectModel, ProjectStatusCounterModel
+from app.routers.admin.crud.common.counters import counter_rows, counts
+
+
+def rebuild_chunk(db, project_ids) -> int:
+    # By module as well, in case a counter still carries a module's old project
+    module_ids = db.query(ModuleModel.id).filter(
+        ModuleModel.project_id.in_(project_ids)
+    )
+    db.query(ProjectStatusCounterModel).filter(
+        or_(
+            ProjectStatusCounterModel.project_id.in_(project_ids),
+            ProjectStatusCounterModel.module_id.in_(module_ids.scalar_subquery()),
+        )
+    ).delete(synchronize_session=False)
+    rows = counter_rows(counts(db, project_ids=project_ids))
+    if rows:
+        db.execute(ProjectStatusCounterModel.__table__.insert(), rows)
+    db.commit()
+    return len(rows)
+
+
+def rebuild(chunk_size: int):
+    db = SessionLocal()
+    try:
+        last_id = ""
+        projects = 0
+        counters = 0
+        while True:
+            # Deleted projects too, so their leftover counters are dropped
+            project_ids = [
+                project_id
+                for (project_id,) in db.query(ProjectModel.id)
+                .filter(ProjectModel.id > last_id)
+                .order_by(ProjectModel.id)
+                .limit(chunk_size)
+            ]
+            if not project_ids:
+                break
+            counters += rebuild_chunk(db, project_ids)
+            projects += len(project_ids)
+            last_id = project_ids[-1]
+            print(f"{projects} projects, {counters} counters")
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--chunk-size", type=int, default=100, help="projects per transaction"
+    )
+    args = parser.parse_args(argv)
+    rebuild(args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
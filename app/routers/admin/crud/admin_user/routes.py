@@ -1,30 +1,32 @@
-from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
+from app.dependencies import get_db, get_principal
 from app.routers.admin.crud.admin_users import admin_users
 from app.routers.admin.schemas import (
     AdminUserChangePassword,
     AdminUserProfileUpdate,
     MyProfile,
+    Principal,
 )
 
 router = APIRouter(prefix="/admin-user", tags=["Admin User"])
 
 
 @router.get("", response_model=MyProfile)
-def get_my_profile(token: str = Header(None), db: Session = Depends(get_db)):
-    data = admin_users.verify_token(db, token=token)
-    return data
+def get_my_profile(principal: Principal = Depends(get_principal)):
+    return principal
 
 
 @router.put("", response_model=MyProfile)
 def update_profile(
     admin_user: AdminUserProfileUpdate,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    data = admin_users.update_profile(db, admin_user=admin_user, token=token)
+    data = admin_users.update_profile(
+        db, admin_user=admin_user, admin_user_id=principal.id
+    )
     return data
 
 
@@ -34,9 +36,8 @@ def update_profile(
 )
 def change_password(
     admin_user: AdminUserChangePassword,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    admin_users.verify_token(db, token=token)
-    admin_users.change_password(db, admin_user=admin_user, token=token)
+    admin_users.change_password(db, admin_user=admin_user, admin_user_id=principal.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
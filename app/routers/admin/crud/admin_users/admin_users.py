@@ -1,19 +1,22 @@
-import json
+import hashlib
 import traceback
-from typing import Optional
+from typing import List, Optional
 
-import bcrypt
 from fastapi import HTTPException, status
-from jwcrypto import jwk, jwt
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
-
-from app.config import JWT_KEY
-from app.libs.emails import send_email
-from app.libs.recaptcha import verify_captcha
-from app.libs.utils import date_time_diff_min, generate_id, generate_otp, now
-from app.models.auth import AdminUserModel, AdminUserOtpModel, AdminUserRoleModel, RoleModel
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+from app.libs.cache import TTLCache
+from app.libs.constants import ADMIN_USER_NOT_FOUND
+from app.libs.keyring import get_key_ring
+from app.libs.passwords import check_password, hash_password
+from app.libs.tokens import decode_token, issue_token
+from app.libs.utils import ListQuery, generate_id, generate_otp, now, paginate
+from app.models.auth import AdminUserModel, AdminUserRoleModel, RoleModel
+from app.routers.admin.crud.admin_users.otps import otp_store
 from app.routers.admin.crud.common.email_templates import forgot_password
+from app.routers.admin.crud.common.outbox import enqueue_email
 from app.routers.admin.schemas import (
     AdminUserAdd,
     AdminUserChangePassword,
@@ -24,63 +27,93 @@ from app.routers.admin.schemas import (
     ForgotPassword,
     Login,
     LoginResponse,
+    Principal,
     VerifyOtp,
 )
 
+# Decoded tokens resolved to their admin user, keyed by a hash of the token
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
 
 def get_token(admin_user_id, email):
     claims = {"id": admin_user_id, "email": email, "time": str(now())}
+    return issue_token(claims)
 
-    # Create a signed token with the generated key
-    key = jwk.JWK(**JWT_KEY)
-    token = jwt.JWT(header={"alg": "HS256"}, claims=claims)
-    token.make_signed_token(key)
 
-    # Further encrypt the token with the same key
-    encrypted_token = jwt.JWT(
-        header={"alg": "A256KW", "enc": "A256CBC-HS512"}, claims=token.serialize()
-    )
-    encrypted_token.make_encrypted_token(key)
-    return encrypted_token.serialize()
+def get_token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
-def verify_token(db: Session, token: str):
+def evict_admin_user_tokens(admin_user_id: str):
+    token_cache.invalidate_tag(admin_user_id)
+
+
+def verify_token(db: Session, token: str) -> Principal:
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token"
         )
-    else:
-        try:
-            key = jwk.JWK(**JWT_KEY)
-            ET = jwt.JWT(key=key, jwt=token)
-            ST = jwt.JWT(key=key, jwt=ET.claims)
-            claims = ST.claims
-            claims = json.loads(claims)
-            db_admin_user = get_admin_user_by_id(db, id=claims["id"])
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
-            )
-        except Exception as e:
-            print(e)
-            print(traceback.format_exc())
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        if db_admin_user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="ADMIN_USER_NOT_FOUND"
-            )
-        elif db_admin_user.is_deleted:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="ADMIN_USER_NOT_FOUND"
-            )
-        return db_admin_user
+
+    # A reloaded key ring bumps its version so tokens cached under the
+    # previous ring are no longer served
+    key_ring = get_key_ring()
+    cache_key = f"{key_ring.version}:{get_token_cache_key(token)}"
+    principal = token_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
+    try:
+        claims = decode_token(token)
+        # Read before loading, so an eviction that lands while the principal
+        # loads keeps the stale principal out of the cache
+        generation = token_cache.generation(claims["id"])
+        principal = load_principal(db, admin_user_id=claims["id"])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    except Exception as e:
+        print(e)
+        print(traceback.format_exc())
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="ADMIN_USER_NOT_FOUND"
+        )
+
+    token_cache.set(cache_key, principal, tag=principal.id, generation=generation)
+    return principal
+
+
+def load_principal(db: Session, admin_user_id: str) -> Optional[Principal]:
+    # User and role in one joined query, operations come from the
+    # permission matrix
+    row = (
+        db.query(
+            AdminUserModel.id,
+            AdminUserModel.name,
+            AdminUserModel.email,
+            RoleModel.id,
+            RoleModel.slug,
+        )
+        .outerjoin(
+            AdminUserRoleModel, AdminUserRoleModel.admin_user_id == AdminUserModel.id
+        )
+        .outerjoin(RoleModel, RoleModel.id == AdminUserRoleModel.role_id)
+        .filter(AdminUserModel.id == admin_user_id, AdminUserModel.is_deleted == False)
+        .first()
+    )
+    if row is None:
+        return None
+
+    id, name, email, role_id, role_slug = row
+    return Principal(
+        id=id, name=name, email=email, role_id=role_id, role_slug=role_slug
+    )
 
 
 def create_password(password: str) -> str:
-    password = password.encode("utf-8")
-    password = bcrypt.hashpw(password, bcrypt.gensalt(4))
-    password = password.decode("utf-8")
-    return password
+    return hash_password(password)
 
 
 def get_admin_user_by_id(db: Session, id: str):
@@ -107,10 +140,7 @@ def sign_in(db: Session, admin_user: Login) -> LoginResponse:
     elif db_admin_user.is_deleted:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    hashed = db_admin_user.password.encode("utf-8")
-    password = admin_user.password.encode("utf-8")
-
-    if not bcrypt.checkpw(password, hashed):
+    if not check_password(admin_user.password, db_admin_user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
     db_admin_user.token = get_token(db_admin_user.id, db_admin_user.email)
@@ -118,12 +148,14 @@ def sign_in(db: Session, admin_user: Login) -> LoginResponse:
     return db_admin_user
 
 
-def change_password(db: Session, admin_user: AdminUserChangePassword, token: str):
-    db_admin_user = verify_token(db, token=token)
+def change_password(
+    db: Session, admin_user: AdminUserChangePassword, admin_user_id: str
+):
+    db_admin_user = get_admin_user_by_id(db, id=admin_user_id)
     try:
-        hashed = bytes(db_admin_user.password, "utf-8")
-        password = bytes(admin_user.old_password, "utf-8")
-        result = bcrypt.checkpw(password, hashed)
+        result = check_password(admin_user.old_password, db_admin_user.password)
+    except HTTPException:
+        raise
     except Exception as e:
         print(e)
         print(traceback.format_exc())
@@ -138,6 +170,7 @@ def change_password(db: Session, admin_user: AdminUserChangePassword, token: str
     db_admin_user.password = password
     db_admin_user.updated_at = now()
     db.commit()
+    evict_admin_user_tokens(db_admin_user.id)
 
 
 def reset_password(db: Session, admin_user: AdminUserResetPassword, admin_user_id: str):
@@ -151,6 +184,19 @@ def reset_password(db: Session, admin_user: AdminUserResetPassword, admin_user_i
         db_admin_user.password = hashed
         db_admin_user.updated_at = now()
         db.commit()
+        evict_admin_user_tokens(admin_user_id)
+
+
+def with_role():
+    # Loads the user's role with the user instead of one query per user
+    return joinedload(AdminUserModel.admin_user_role).joinedload(
+        AdminUserRoleModel.role
+    )
+
+
+def role_of(db_admin_user: AdminUserModel) -> Optional[RoleModel]:
+    admin_user_roles = db_admin_user.admin_user_role
+    return admin_user_roles[0].role if admin_user_roles else None
 
 
 def get_admin_user_role(db: Session, admin_user_id: str) -> RoleModel:
@@ -175,25 +221,16 @@ def is_super_admin(db: Session, admin_user_id: str):
 
 
 def send_forgot_password_email(db: Session, admin_user: ForgotPassword):
-    # verify_captcha(captcha_token=admin_user.captcha_token)
     db_admin_user = get_admin_user_by_email(db=db, email=admin_user.email)
     if not db_admin_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     otp = generate_otp()
-    db_otp = AdminUserOtpModel(
-        id=generate_id(),
-        otp=otp,
-        admin_user_id=db_admin_user.id,
-    )
-    db.add(db_otp)
+    otp_store.add(db, admin_user_id=db_admin_user.id, otp=otp)
     email_body = forgot_password(name=db_admin_user.name, otp=otp)
-    if not send_email(
-        recipients=[db_admin_user.email], subject="Forgot Password", body=email_body
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error while sending email.",
-        )
+    # Sent by the outbox worker, committed together with the OTP
+    enqueue_email(
+        db, recipients=[db_admin_user.email], subject="Forgot Password", body=email_body
+    )
     db.commit()
 
     return "Email sent"
@@ -207,20 +244,11 @@ def verify_otp(db: Session, admin_user: VerifyOtp):
             detail="Email not registered",
         )
 
-    date_time = now()
-    db_otp = (
-        db.query(AdminUserOtpModel)
-        .filter(AdminUserOtpModel.admin_user_id == db_admin_user.id)
-        .order_by(AdminUserOtpModel.created_at.desc())
-        .first()
-    )
-    if db_otp.is_redeemed:
+    # Only unredeemed OTPs inside the TTL are returned by the store
+    db_otp = otp_store.get_active(db, admin_user_id=db_admin_user.id)
+    if db_otp is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid OTP."
-        )
-    elif date_time_diff_min(start=db_otp.created_at, end=date_time) >= 10:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="OTP expired."
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired OTP."
         )
     elif db_otp.otp != admin_user.otp:
         raise HTTPException(
@@ -228,8 +256,7 @@ def verify_otp(db: Session, admin_user: VerifyOtp):
         )
 
     db_admin_user.updated_at = now()
-    db_otp.is_redeemed = True
-    db_otp.updated_at = now()
+    otp_store.redeem(db, db_otp)
     db.commit()
 
     return "Otp verified"
@@ -250,6 +277,7 @@ def confirm_forgot_password(db: Session, admin_user: ConfirmForgotPassword):
         )
     db_admin_user.password = create_password(admin_user.password)
     db.commit()
+    evict_admin_user_tokens(db_admin_user.id)
 
     return "Password changed"
 
@@ -306,14 +334,12 @@ def add_admin_user(db: Session, admin_user: AdminUserAdd):
     return db_admin_user.id
 
 
-def get_admin_users(
+def build_admin_users_query(
     db: Session,
-    start: int,
-    limit: int,
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
-):
+) -> ListQuery:
     query = db.query(AdminUserModel).filter(AdminUserModel.is_deleted == False)
 
     if search:
@@ -326,24 +352,44 @@ def get_admin_users(
         )
 
     if sort_by == "name":
-        if order == "desc":
-            query = query.order_by(AdminUserModel.name.desc())
-        else:
-            query = query.order_by(AdminUserModel.name)
+        column = AdminUserModel.name
     elif sort_by == "email":
-        if order == "desc":
-            query = query.order_by(AdminUserModel.email.desc())
-        else:
-            query = query.order_by(AdminUserModel.email)
+        column = AdminUserModel.email
     else:
-        query = query.order_by(AdminUserModel.created_at.desc())
-
-    results = query.offset(start).limit(limit).all()
-    count = query.count()
-    for admin_user in results:
-        admin_user_role = get_admin_user_role(db, admin_user.id)
-        admin_user.role = admin_user_role
-    data = {"count": count, "list": results}
+        column = AdminUserModel.created_at
+    descending = order == "desc" if sort_by in ("name", "email") else True
+    return ListQuery(
+        query=query, sort_column=column, descending=descending, ranked=False
+    )
+
+
+def get_admin_users(
+    db: Session,
+    start: int,
+    limit: int,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
+):
+    list_query = build_admin_users_query(
+        db, sort_by=sort_by, order=order, search=search
+    )
+    page = paginate(
+        list_query.query.options(with_role()),
+        sort_column=list_query.sort_column,
+        id_column=AdminUserModel.id,
+        descending=list_query.descending,
+        start=start,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        filtered=bool(search),
+    )
+    for admin_user in page.list:
+        admin_user.role = role_of(admin_user)
+    data = {"count": page.count, "list": page.list, "next_cursor": page.next_cursor}
     return data
 
 
@@ -361,26 +407,49 @@ def delete_admin_user(db: Session, admin_user_id: str):
     db_admin_user.is_deleted = True
     db_admin_user.updated_at = now()
     db.commit()
+    evict_admin_user_tokens(admin_user_id)
 
 
-def update_profile(db: Session, admin_user: AdminUserProfileUpdate, token: str):
-    db_admin_user = verify_token(db, token=token)
+def update_profile(db: Session, admin_user: AdminUserProfileUpdate, admin_user_id: str):
+    db_admin_user = get_admin_user_by_id(db, id=admin_user_id)
     db_admin_user.name = admin_user.name
     db_admin_user.updated_at = now()
     db.commit()
+    evict_admin_user_tokens(db_admin_user.id)
     return db_admin_user
 
 
 def get_admin_user(db: Session, admin_user_id: str):
-    db_admin_user = get_admin_user_by_id(db, id=admin_user_id)
+    db_admin_user = (
+        db.query(AdminUserModel)
+        .options(with_role())
+        .filter(AdminUserModel.id == admin_user_id, AdminUserModel.is_deleted == False)
+        .first()
+    )
     if db_admin_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="ADMIN_USER_NOT_FOUND"
         )
-    db_admin_user.role = db_admin_user.admin_user_role[0].role
+    db_admin_user.role = role_of(db_admin_user)
     return db_admin_user
 
 
+def get_admin_users_by_ids(db: Session, admin_user_ids: List[str]):
+    # One IN query, every id has to be a live admin user
+    db_admin_users = (
+        db.query(AdminUserModel)
+        .filter(
+            AdminUserModel.id.in_(admin_user_ids), AdminUserModel.is_deleted == False
+        )
+        .all()
+    )
+    if len(db_admin_users) != len(set(admin_user_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ADMIN_USER_NOT_FOUND
+        )
+    return db_admin_users
+
+
 def update_admin_user(db: Session, admin_user_id: str, admin_user: AdminUserUpdate):
     db_admin_user = get_admin_user_by_id(db, id=admin_user_id)
     if db_admin_user is None:
@@ -404,6 +473,7 @@ def update_admin_user(db: Session, admin_user_id: str, admin_user: AdminUserUpda
         update_admin_user_role(
             db, admin_user_id=admin_user_id, role_id=admin_user.role_id
         )
+    evict_admin_user_tokens(admin_user_id)
     db_admin_user = get_admin_user(db, admin_user_id=admin_user_id)
     return db_admin_user
 
@@ -0,0 +1,121 @@
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import OTP_STORE, OTP_TTL_MINUTES
+from app.database import SessionLocal
+from app.libs.utils import generate_id, now
+from app.models.auth import AdminUserOtpModel
+
+OtpRecord = namedtuple("OtpRecord", ["admin_user_id", "otp", "created_at"])
+
+
+class SqlOtpStore:
+    """OTPs in `admin_user_otps`, looked up through (admin_user_id, created_at).
+
+    add() and redeem() leave the commit to the caller so the OTP is written
+    in the same transaction as the rest of the request.
+    """
+
+    def __init__(self, ttl_minutes: int):
+        self.ttl = timedelta(minutes=ttl_minutes)
+
+    def add(self, db: Session, admin_user_id: str, otp: str):
+        db_otp = AdminUserOtpModel(
+            id=generate_id(), otp=otp, admin_user_id=admin_user_id
+        )
+        db.add(db_otp)
+        return db_otp
+
+    def get_active(
+        self, db: Session, admin_user_id: str
+    ) -> Optional[AdminUserOtpModel]:
+        # Only the latest OTP counts, once it is redeemed the ones it
+        # replaced must not become valid again
+        db_otp = (
+            db.query(AdminUserOtpModel)
+            .filter(
+                AdminUserOtpModel.admin_user_id == admin_user_id,
+                AdminUserOtpModel.created_at > now() - self.ttl,
+            )
+            .order_by(AdminUserOtpModel.created_at.desc())
+            .first()
+        )
+        if db_otp is None or db_otp.is_redeemed:
+            return None
+        return db_otp
+
+    def redeem(self, db: Session, db_otp: AdminUserOtpModel):
+        db_otp.is_redeemed = True
+        db_otp.updated_at = now()
+
+    def purge(self, db: Session) -> int:
+        # Two deletes rather than one OR, so each can use its own index
+        count = (
+            db.query(AdminUserOtpModel)
+            .filter(AdminUserOtpModel.is_redeemed == True)
+            .delete(synchronize_session=False)
+        )
+        count += (
+            db.query(AdminUserOtpModel)
+            .filter(AdminUserOtpModel.created_at <= now() - self.ttl)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+
+class MemoryOtpStore:
+    """Latest OTP per admin user kept in process, for single node and tests."""
+
+    def __init__(self, ttl_minutes: int):
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self._otps = {}
+        self._lock = threading.Lock()
+
+    def add(self, db: Session, admin_user_id: str, otp: str):
+        record = OtpRecord(admin_user_id=admin_user_id, otp=otp, created_at=now())
+        with self._lock:
+            self._otps[admin_user_id] = record
+        return record
+
+    def get_active(self, db: Session, admin_user_id: str) -> Optional[OtpRecord]:
+        with self._lock:
+            record = self._otps.get(admin_user_id)
+            if record is not None and record.created_at <= now() - self.ttl:
+                del self._otps[admin_user_id]
+                record = None
+        return record
+
+    def redeem(self, db: Session, record: OtpRecord):
+        with self._lock:
+            if self._otps.get(record.admin_user_id) == record:
+                del self._otps[record.admin_user_id]
+
+    def purge(self, db: Session) -> int:
+        expired_before = now() - self.ttl
+        with self._lock:
+            expired = [
+                admin_user_id
+                for admin_user_id, record in self._otps.items()
+                if record.created_at <= expired_before
+            ]
+            for admin_user_id in expired:
+                del self._otps[admin_user_id]
+        return len(expired)
+
+
+OTP_STORES = {"sql": SqlOtpStore, "memory": MemoryOtpStore}
+
+otp_store = OTP_STORES[OTP_STORE](ttl_minutes=OTP_TTL_MINUTES)
+
+
+def purge_expired_otps():
+    db = SessionLocal()
+    try:
+        otp_store.purge(db)
+    finally:
+        db.close()
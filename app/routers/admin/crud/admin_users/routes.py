@@ -1,12 +1,17 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import ADMIN_USER_ID, ORDER_BY
+from app.dependencies import get_db, get_principal, require
+from app.libs.constants import (
+    ADMIN_USER_ID,
+    COUNT_MODE,
+    COUNT_MODE_PATTERN,
+    CURSOR,
+    ORDER_BY,
+)
 from app.routers.admin.crud.admin_users import admin_users
-from app.routers.admin.crud.operations import operations
 from app.routers.admin.schemas import (
     AdminUser,
     AdminUserAdd,
@@ -15,6 +20,7 @@ from app.routers.admin.schemas import (
     AdminUserResetPassword,
     AdminUserSmall,
     AdminUserUpdate,
+    Principal,
 )
 
 router = APIRouter(prefix="/admin-users", tags=["Admin Users"])
@@ -22,20 +28,27 @@ router = APIRouter(prefix="/admin-users", tags=["Admin Users"])
 
 @router.get("", response_model=AdminUserList)
 def get_admin_users(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(require("List Admin Users")),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="List Admin Users"
-    )
     data = admin_users.get_admin_users(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
@@ -43,13 +56,9 @@ def get_admin_users(
 @router.post("", status_code=status.HTTP_201_CREATED)
 def add_admin_user(
     admin_user: AdminUserAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(require("Add Admin User")),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    )
     data = admin_users.add_admin_user(db, admin_user=admin_user)
     return data
 
@@ -59,8 +68,9 @@ def add_admin_user(
     response_model=List[AdminUserSmall],
     tags=["Admin Users"],
 )
-def get_all_admin_users(token: str = Header(None), db: Session = Depends(get_db)):
-    admin_users.verify_token(db, token=token)
+def get_all_admin_users(
+    principal: Principal = Depends(get_principal), db: Session = Depends(get_db)
+):
     data = admin_users.get_all_admin_users(db)
     return data
 
@@ -71,14 +81,10 @@ def get_all_admin_users(token: str = Header(None), db: Session = Depends(get_db)
     tags=["Admin Users"],
 )
 def get_admin_user(
-    token: str = Header(None),
+    principal: Principal = Depends(require("Edit Admin User")),
     admin_user_id: str = Path(title=ADMIN_USER_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    )
     data = admin_users.get_admin_user(db, admin_user_id=admin_user_id)
     return data
 
@@ -90,14 +96,10 @@ def get_admin_user(
 )
 def update_admin_user(
     admin_user: AdminUserUpdate,
-    token: str = Header(None),
+    principal: Principal = Depends(require("Edit Admin User")),
     admin_user_id: str = Path(title=ADMIN_USER_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    )
     data = admin_users.update_admin_user(
         db, admin_user_id=admin_user_id, admin_user=admin_user
     )
@@ -110,14 +112,10 @@ def update_admin_user(
     tags=["Admin Users"],
 )
 def delete_admin_user(
-    token: str = Header(None),
+    principal: Principal = Depends(require("Delete Admin User")),
     admin_user_id: str = Path(title=ADMIN_USER_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    )
     admin_users.delete_admin_user(db, admin_user_id=admin_user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -129,13 +127,9 @@ def delete_admin_user(
 )
 def reset_password(
     admin_user: AdminUserResetPassword,
-    token: str = Header(None),
+    principal: Principal = Depends(require("Reset Password")),
     admin_user_id: str = Path(title=ADMIN_USER_ID, min_length=36, max_length=36),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Reset Password"
-    )
     admin_users.reset_password(db, admin_user=admin_user, admin_user_id=admin_user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
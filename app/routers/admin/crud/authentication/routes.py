@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_db
+from app.libs.recaptcha import verify_captcha
 from app.routers.admin.crud.admin_users import admin_users
 from app.routers.admin.schemas import (
     ConfirmForgotPassword,
@@ -21,10 +23,14 @@ def sign_in(admin_user: Login, db: Session = Depends(get_db)):
 
 
 @router.post("/forgot-password")
-def send_forgot_password_email(
+async def send_forgot_password_email(
     admin_user: ForgotPassword, db: Session = Depends(get_db)
 ):
-    data = admin_users.send_forgot_password_email(db=db, admin_user=admin_user)
+    # Awaited on the event loop so a slow verification never holds a thread
+    await verify_captcha(captcha_token=admin_user.captcha_token)
+    data = await run_in_threadpool(
+        admin_users.send_forgot_password_email, db=db, admin_user=admin_user
+    )
     return data
 
 
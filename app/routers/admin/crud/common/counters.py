@@ -0,0 +1,225 @@
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+from sqlalchemy import String, func, literal, select, type_coerce, union_all
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from app.libs.utils import now
+from app.models import (
+    IssueModel,
+    ModuleModel,
+    ProjectModel,
+    ProjectStatusCounterModel,
+    TaskModel,
+)
+
+MODULE = "module"
+TASK = "task"
+ISSUE = "issue"
+
+COUNTER_KEY = ["module_id", "kind", "status", "priority"]
+
+# Rows a locking count holds, per kind
+COUNTED_TABLES = {MODULE: ModuleModel, TASK: TaskModel, ISSUE: IssueModel}
+
+
+def count_parts(
+    project_ids: Optional[List[str]] = None,
+    module_ids: Optional[List[str]] = None,
+    task_ids: Optional[List[str]] = None,
+    issue_ids: Optional[List[str]] = None,
+) -> dict:
+    """The selects of counts_query by kind."""
+    live = [ProjectModel.is_deleted == False, ModuleModel.is_deleted == False]
+    if project_ids is not None:
+        live.append(ModuleModel.project_id.in_(project_ids))
+    if module_ids is not None:
+        live.append(ModuleModel.id.in_(module_ids))
+
+    parts = {}
+    if task_ids is None and issue_ids is None:
+        parts[MODULE] = (
+            select(
+                ModuleModel.project_id,
+                ModuleModel.id,
+                literal(MODULE),
+                literal(""),
+                literal(""),
+                func.count(),
+            )
+            .join(ProjectModel, ProjectModel.id == ModuleModel.project_id)
+            .where(*live)
+            .group_by(ModuleModel.project_id, ModuleModel.id)
+        )
+
+    task_filters = [TaskModel.is_deleted == False]
+    if task_ids is not None:
+        task_filters.append(TaskModel.id.in_(task_ids))
+    if issue_ids is None:
+        parts[TASK] = (
+            select(
+                ModuleModel.project_id,
+                TaskModel.module_id,
+                literal(TASK),
+                type_coerce(TaskModel.status, String),
+                literal(""),
+                func.count(),
+            )
+            .join(ModuleModel, ModuleModel.id == TaskModel.module_id)
+            .join(ProjectModel, ProjectModel.id == ModuleModel.project_id)
+            .where(*live, *task_filters)
+            .group_by(ModuleModel.project_id, TaskModel.module_id, TaskModel.status)
+        )
+
+    issue_filters = [IssueModel.is_deleted == False]
+    if issue_ids is not None:
+        issue_filters.append(IssueModel.id.in_(issue_ids))
+    parts[ISSUE] = (
+        select(
+            ModuleModel.project_id,
+            TaskModel.module_id,
+            literal(ISSUE),
+            type_coerce(IssueModel.status, String),
+            type_coerce(IssueModel.priority, String),
+            func.count(),
+        )
+        .join(TaskModel, TaskModel.id == IssueModel.task_id)
+        .join(ModuleModel, ModuleModel.id == TaskModel.module_id)
+        .join(ProjectModel, ProjectModel.id == ModuleModel.project_id)
+        .where(*live, *task_filters, *issue_filters)
+        .group_by(
+            ModuleModel.project_id,
+            TaskModel.module_id,
+            IssueModel.status,
+            IssueModel.priority,
+        )
+    )
+    return parts
+
+
+def counts_query(
+    project_ids: Optional[List[str]] = None,
+    module_ids: Optional[List[str]] = None,
+    task_ids: Optional[List[str]] = None,
+    issue_ids: Optional[List[str]] = None,
+):
+    """(project_id, module_id, kind, status, priority, total) of live rows.
+
+    task_ids counts those tasks and their issues, issue_ids only those
+    issues. Without either, modules, tasks and issues are all counted.
+    """
+    parts = count_parts(
+        project_ids=project_ids,
+        module_ids=module_ids,
+        task_ids=task_ids,
+        issue_ids=issue_ids,
+    )
+    return union_all(*parts.values())
+
+
+def counts(db: Session, lock: bool = False, **filters) -> Counter:
+    """Counts of counts_query, `lock` reads them with FOR UPDATE.
+
+    A locking read sees the latest committed rows rather than the
+    transaction's snapshot and holds them until commit, one statement per
+    kind as FOR UPDATE does not apply to a UNION.
+    """
+    if lock:
+        rows = [
+            row
+            for kind, part in count_parts(**filters).items()
+            for row in db.execute(part.with_for_update(of=COUNTED_TABLES[kind]))
+        ]
+    else:
+        rows = db.execute(counts_query(**filters))
+    return Counter({tuple(row[:5]): row[5] for row in rows})
+
+
+def counter_rows(deltas: Counter) -> list:
+    return [
+        {
+            "project_id": project_id,
+            "module_id": module_id,
+            "kind": kind,
+            "status": status,
+            "priority": priority,
+            "total": total,
+            "updated_at": now(),
+        }
+        for (project_id, module_id, kind, status, priority), total in deltas.items()
+        if total
+    ]
+
+
+def bump(db: Session, deltas: Counter):
+    """Add `deltas` to the counters with one multi-row upsert."""
+    rows = counter_rows(deltas)
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql.insert(ProjectStatusCounterModel)
+        stmt = stmt.on_duplicate_key_update(
+            total=ProjectStatusCounterModel.total + stmt.inserted.total,
+            project_id=stmt.inserted.project_id,
+            updated_at=stmt.inserted.updated_at,
+        )
+    else:
+        stmt = sqlite.insert(ProjectStatusCounterModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=COUNTER_KEY,
+            set_={
+                "total": ProjectStatusCounterModel.total + stmt.excluded.total,
+                "project_id": stmt.excluded.project_id,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    db.execute(stmt, rows)
+
+
+def count_new(db: Session, **filters):
+    """Count rows just written in this transaction, see counts_query."""
+    db.flush()
+    bump(db, counts(db, **filters))
+
+
+@contextmanager
+def tracked(
+    db: Session,
+    task_ids: Optional[List[str]] = None,
+    issue_ids: Optional[List[str]] = None,
+):
+    """Bump the counters by whatever the block changes for these rows.
+
+    The rows are counted before and after the block, only the difference
+    is written, in the caller's transaction. Both counts are locking reads,
+    so a concurrent change of the same rows waits for this one to commit
+    and then counts from its result instead of the same old status.
+    """
+    before = counts(db, lock=True, task_ids=task_ids, issue_ids=issue_ids)
+    yield
+    db.flush()
+    after = counts(db, lock=True, task_ids=task_ids, issue_ids=issue_ids)
+    after.subtract(before)
+    bump(db, after)
+
+
+def move_counters(db: Session, module_id: str, project_id: str):
+    db.query(ProjectStatusCounterModel).filter(
+        ProjectStatusCounterModel.module_id == module_id
+    ).update({"project_id": project_id}, synchronize_session=False)
+
+
+def drop_counters(
+    db: Session,
+    module_ids: Optional[List[str]] = None,
+    project_ids: Optional[List[str]] = None,
+):
+    # Soft deleted modules and projects no longer count anything
+    query = db.query(ProjectStatusCounterModel)
+    if module_ids is not None:
+        query = query.filter(ProjectStatusCounterModel.module_id.in_(module_ids))
+    if project_ids is not None:
+        query = query.filter(ProjectStatusCounterModel.project_id.in_(project_ids))
+    query.delete(synchronize_session=False)
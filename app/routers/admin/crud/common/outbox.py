@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.config import (
+    EMAIL_OUTBOX_BACKOFF,
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_LEASE,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+)
+from app.database import SessionLocal
+from app.libs.emails import deliver_email
+from app.libs.utils import generate_id, now
+from app.models.emails import EmailOutboxModel, EmailStatusEnum
+
+
+def enqueue_email(db: Session, recipients: List[str], subject: str, body: str):
+    """Queue an email in the caller's transaction, the caller commits."""
+    db_email = EmailOutboxModel(
+        id=generate_id(),
+        recipients=json.dumps(recipients),
+        subject=subject,
+        body=body,
+        status=EmailStatusEnum.PENDING,
+        attempts=0,
+        next_attempt_at=now(),
+    )
+    db.add(db_email)
+    return db_email
+
+
+def claim_emails(db: Session, lease_id: str, batch_size: int) -> list:
+    """Lease a batch of due emails to this worker and commit the claim.
+
+    SKIP LOCKED lets several workers claim at once without taking the same
+    row. The rows stay PENDING but are not due again until the lease runs
+    out, which is how a batch left by a crashed worker gets retried.
+    """
+    db_emails = (
+        db.query(EmailOutboxModel)
+        .filter(
+            EmailOutboxModel.status == EmailStatusEnum.PENDING,
+            EmailOutboxModel.next_attempt_at <= now(),
+        )
+        .order_by(EmailOutboxModel.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    emails = []
+    for db_email in db_emails:
+        db_email.lease_id = lease_id
+        db_email.next_attempt_at = now() + timedelta(seconds=EMAIL_OUTBOX_LEASE)
+        emails.append(
+            {
+                "id": db_email.id,
+                "recipients": json.loads(db_email.recipients),
+                "subject": db_email.subject,
+                "body": db_email.body,
+            }
+        )
+    db.commit()
+    return emails
+
+
+def record_results(db: Session, lease_id: str, errors: dict):
+    """Mark sent or schedule the retry of each claimed email, one commit.
+
+    `errors` maps every claimed id to its error, None when it was sent.
+    Rows whose lease has since passed to another worker are left alone.
+    """
+    db_emails = (
+        db.query(EmailOutboxModel)
+        .filter(
+            EmailOutboxModel.id.in_(list(errors)),
+            EmailOutboxModel.lease_id == lease_id,
+        )
+        .with_for_update()
+        .all()
+    )
+    for db_email in db_emails:
+        error = errors[db_email.id]
+        db_email.lease_id = None
+        if error is None:
+            db_email.status = EmailStatusEnum.SENT
+            db_email.last_error = None
+        else:
+            db_email.attempts += 1
+            db_email.last_error = error[:1000]
+            if db_email.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+                db_email.status = EmailStatusEnum.DEAD
+            else:
+                delay = EMAIL_OUTBOX_BACKOFF * 2 ** (db_email.attempts - 1)
+                db_email.next_attempt_at = now() + timedelta(seconds=delay)
+        db_email.updated_at = now()
+    db.commit()
+
+
+def drain_outbox(db: Session, batch_size: int = EMAIL_OUTBOX_BATCH_SIZE) -> int:
+    # Claim, send and record in separate steps so no transaction, row lock
+    # or pooled connection is held while emails go over the network
+    lease_id = generate_id()
+    emails = claim_emails(db, lease_id=lease_id, batch_size=batch_size)
+    if not emails:
+        return 0
+    errors = {}
+    for email in emails:
+        try:
+            deliver_email(
+                recipients=email["recipients"],
+                subject=email["subject"],
+                body=email["body"],
+            )
+            errors[email["id"]] = None
+        except Exception as e:
+            print(e)
+            errors[email["id"]] = str(e)
+    record_results(db, lease_id=lease_id, errors=errors)
+    return len(emails)
+
+
+def send_pending_emails():
+    db = SessionLocal()
+    try:
+        # Keep going while batches come back full
+        while drain_outbox(db) == EMAIL_OUTBOX_BATCH_SIZE:
+            pass
+    finally:
+        db.close()
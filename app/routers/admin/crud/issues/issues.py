@@ -1,14 +1,31 @@
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.libs.constants import ISSUE_NOT_FOUND, TASK_NOT_FOUND
-from app.libs.utils import generate_id, list_data, now
-from app.models import IssueModel, IssueStatusEnum, IssueUserModel
-from app.routers.admin.crud.admin_users.admin_users import get_admin_user
+from app.libs.export import export_rows
+from app.libs.utils import (
+    check_bulk_size,
+    eager_options,
+    existing_ids,
+    generate_id,
+    insert_ignore,
+    list_data,
+    now,
+)
+from app.models import IssueModel, IssueStatusEnum, IssueUserModel, TaskModel
+from app.routers.admin.crud.admin_users.admin_users import get_admin_users_by_ids
+from app.routers.admin.crud.common.counters import count_new, tracked
 from app.routers.admin.crud.tasks.tasks import get_task
-from app.routers.admin.schemas import IssueAdd, IssueUser, IssueUserAssign
+from app.routers.admin.schemas import (
+    Issue,
+    IssueAdd,
+    IssueBulkUpdate,
+    IssueUser,
+    IssueUserAssign,
+)
 
 
 def get_issues(
@@ -18,6 +35,8 @@ def get_issues(
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     data = list_data(
         db,
@@ -27,14 +46,37 @@ def get_issues(
         sort_by=sort_by,
         order=order,
         search=search,
+        cursor=cursor,
+        count_mode=count_mode,
+        schema=Issue,
     )
 
-    
     return data
 
 
+def export_issues(
+    format: str,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    return export_rows(
+        IssueModel,
+        schema=Issue,
+        format=format,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+    )
+
+
 def get_issue(db: Session, issue_id: str):
-    issue = db.query(IssueModel).filter_by(id=issue_id, is_deleted=False).first()
+    issue = (
+        db.query(IssueModel)
+        .options(*eager_options(IssueModel, Issue))
+        .filter_by(id=issue_id, is_deleted=False)
+        .first()
+    )
     if not issue:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=ISSUE_NOT_FOUND
@@ -66,6 +108,7 @@ def add_issue(db: Session, request: IssueAdd):
     # Add the issue
     issue = IssueModel(id=generate_id(), **request.dict())
     db.add(issue)
+    count_new(db, issue_ids=[issue.id])
     db.commit()
     db.refresh(issue)
     return issue
@@ -82,23 +125,81 @@ def update_issue(db: Session, issue_id: str, request: IssueAdd):
             status_code=status.HTTP_404_NOT_FOUND, detail=TASK_NOT_FOUND
         )
 
-    # Update the issue
-    issue.name = request.name
-    issue.description = request.description
-    issue.task_id = request.task_id
-    issue.update_at = now()
+    # Update the issue, moving it moves its counters along
+    with tracked(db, issue_ids=[issue_id]):
+        issue.name = request.name
+        issue.description = request.description
+        issue.task_id = request.task_id
+        issue.update_at = now()
 
     db.commit()
     db.refresh(issue)
     return issue
 
 
+def add_issues(db: Session, request: List[IssueAdd]):
+    check_bulk_size(request)
+    # Every parent checked with one IN query
+    task_ids = existing_ids(db, TaskModel, [item.task_id for item in request])
+
+    rows = []
+    succeeded = []
+    failed = []
+    for index, item in enumerate(request):
+        if item.task_id not in task_ids:
+            failed.append({"index": index, "detail": TASK_NOT_FOUND})
+            continue
+        # status, is_deleted and timestamps come from the column defaults
+        row = {"id": generate_id(), **item.dict()}
+        rows.append(row)
+        succeeded.append({"index": index, "id": row["id"]})
+
+    # One multi-row INSERT and one commit for the whole batch
+    if rows:
+        db.execute(insert(IssueModel), rows)
+        count_new(db, issue_ids=[row["id"] for row in rows])
+        db.commit()
+    return {"succeeded": succeeded, "failed": failed}
+
+
+def update_issues(db: Session, request: List[IssueBulkUpdate]):
+    check_bulk_size(request)
+    issue_ids = existing_ids(db, IssueModel, [item.id for item in request])
+    task_ids = existing_ids(db, TaskModel, [item.task_id for item in request])
+
+    rows = []
+    seen = set()
+    succeeded = []
+    failed = []
+    for index, item in enumerate(request):
+        if item.id not in issue_ids:
+            detail = ISSUE_NOT_FOUND
+        elif item.id in seen:
+            detail = "Duplicate id."
+        elif item.task_id not in task_ids:
+            detail = TASK_NOT_FOUND
+        else:
+            seen.add(item.id)
+            rows.append({**item.dict(), "updated_at": now()})
+            succeeded.append({"index": index, "id": item.id})
+            continue
+        failed.append({"index": index, "id": item.id, "detail": detail})
+
+    # Bulk UPDATE by primary key, executemany in one commit
+    if rows:
+        with tracked(db, issue_ids=list(seen)):
+            db.execute(update(IssueModel), rows)
+        db.commit()
+    return {"succeeded": succeeded, "failed": failed}
+
+
 def delete_issue(db: Session, issue_id: str):
     # Fetch the issue
     issue = get_issue(db, issue_id)
 
     # Delete the issue
-    issue.is_deleted = True
+    with tracked(db, issue_ids=[issue_id]):
+        issue.is_deleted = True
     db.commit()
 
 
@@ -107,31 +208,33 @@ def close_issue(db: Session, issue_id: str):
     issue = get_open_issue(db, issue_id)
 
     # Close the issue
-    issue.status = IssueStatusEnum.CLOSED
+    with tracked(db, issue_ids=[issue.id]):
+        issue.status = IssueStatusEnum.CLOSED
     db.commit()
     db.refresh(issue)
     return issue
 
 
 def assign_user_issue(db: Session, request: IssueUserAssign) -> IssueUser:
-    # Iterate through the list of admin_user_ids in the request
-    for admin_user_id in request.admin_user_ids:
-        id = generate_id()
-
-        # Create a new ProjectUserModel instance for each admin_user_id
-        issue_user = IssueUserModel(
-            id=id, issue_id=request.issue_id, admin_user_id=admin_user_id
-        )
-
-        db.add(issue_user)
-        db.commit()
-        db.refresh(issue_user)
-
-    # Retrieve the admin_users based on their ids and create a list
-    admin_users = [
-        get_admin_user(db, admin_user_id) for admin_user_id in request.admin_user_ids
+    issue = get_issue(db, request.issue_id)
+    admin_users = get_admin_users_by_ids(db, request.admin_user_ids)
+
+    # One multi-row insert, memberships that already exist are skipped by
+    # the unique (issue_id, admin_user_id) constraint
+    rows = [
+        {
+            "id": generate_id(),
+            "issue_id": request.issue_id,
+            "admin_user_id": admin_user.id,
+        }
+        for admin_user in admin_users
     ]
+    db.execute(insert_ignore(IssueUserModel), rows)
 
-    # Set the admin_users list to the project_user instance
-    issue_user.admin_users = admin_users
-    return issue_user
+    # Serialized before the commit expires the loaded rows, otherwise every
+    # admin user is selected again
+    data = IssueUser.model_validate(
+        {"issue": issue, "admin_users": admin_users}, from_attributes=True
+    )
+    db.commit()
+    return data
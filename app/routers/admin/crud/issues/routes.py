@@ -1,19 +1,31 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import ISSUE_ID, ORDER_BY, TASK_ID
-from app.routers.admin.crud.admin_users import admin_users
+from app.dependencies import get_db, get_principal
+from app.libs.constants import (
+    COUNT_MODE,
+    COUNT_MODE_PATTERN,
+    CURSOR,
+    EXPORT_FORMAT,
+    EXPORT_FORMAT_PATTERN,
+    ISSUE_ID,
+    ORDER_BY,
+    TASK_ID,
+)
+from app.libs.export import EXPORT_MEDIA_TYPES
 from app.routers.admin.crud.issues import issues
-from app.routers.admin.crud.operations import operations
 from app.routers.admin.schemas import (
+    BulkResult,
     Issue,
     IssueAdd,
+    IssueBulkUpdate,
     IssuesList,
     IssueUser,
     IssueUserAssign,
+    Principal,
 )
 
 router = APIRouter(prefix="/issues", tags=["Issues"])
@@ -21,34 +33,77 @@ router = APIRouter(prefix="/issues", tags=["Issues"])
 
 @router.get("", response_model=IssuesList)
 def get_issues(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(get_principal),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="List Admin Users"
-    # )
     data = issues.get_issues(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
+    )
+    return data
+
+
+@router.get("/export")
+def export_issues(
+    principal: Principal = Depends(get_principal),
+    format: str = Query(
+        "ndjson", pattern=EXPORT_FORMAT_PATTERN, description=EXPORT_FORMAT
+    ),
+    sort_by: Optional[str] = Query(None, max_length=50),
+    order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
+    search: Optional[str] = Query(None, max_length=50),
+):
+    rows = issues.export_issues(
+        format=format, sort_by=sort_by, order=order, search=search
+    )
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=issues.{format}"},
     )
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=BulkResult)
+def add_issues(
+    request: List[IssueAdd],
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    data = issues.add_issues(db, request=request)
+    return data
+
+
+@router.put("/bulk", response_model=BulkResult)
+def update_issues(
+    request: List[IssueBulkUpdate],
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    data = issues.update_issues(db, request=request)
     return data
 
 
 @router.get("/{issue_id}", response_model=Issue)
 def get_issue(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     issue_id: str = Path(title=TASK_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = issues.get_issue(db, issue_id=issue_id)
     return data
 
@@ -56,13 +111,9 @@ def get_issue(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=Issue)
 def add_issue(
     request: IssueAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = issues.add_issue(db, request=request)
     return data
 
@@ -70,43 +121,30 @@ def add_issue(
 @router.put("/{issue_id}", response_model=Issue)
 def update_issue(
     request: IssueAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     issue_id: str = Path(title=ISSUE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = issues.update_issue(db, issue_id=issue_id, request=request)
     return data
 
 
 @router.delete("/{issue_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_issue(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     issue_id: str = Path(title=ISSUE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    # )
     issues.delete_issue(db, issue_id=issue_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.patch("/{issue_id}/close")
 def close_issue(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     issue_id: str = Path(title=ISSUE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    # )
-
     issues.close_issue(db, issue_id=issue_id)
     return "Issue is Closed"
 
@@ -116,12 +154,8 @@ def close_issue(
 )
 def assign_user_issue(
     request: IssueUserAssign,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = issues.assign_user_issue(db, request=request)
     return data
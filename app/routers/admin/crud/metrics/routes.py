@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies import get_principal
+from app.libs import passwords, recaptcha, reports
+from app.routers.admin.crud.admin_users import admin_users
+from app.routers.admin.schemas import Principal
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+def get_metrics(principal: Principal = Depends(get_principal)):
+    data = {
+        "token_cache": admin_users.token_cache.stats(),
+        "password_hashing": passwords.stats(),
+        "recaptcha_breaker": recaptcha.breaker.stats(),
+        "report_jobs": reports.jobs.stats(),
+    }
+    return data
@@ -16,6 +16,8 @@ def get_module_types(
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     data = list_data(
         db,
@@ -25,6 +27,8 @@ def get_module_types(
         sort_by=sort_by,
         order=order,
         search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
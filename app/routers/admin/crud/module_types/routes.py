@@ -1,48 +1,60 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import MODULE_TYPE_ID, ORDER_BY
-from app.routers.admin.crud.admin_users import admin_users
+from app.dependencies import get_db, get_principal
+from app.libs.constants import (
+    COUNT_MODE,
+    COUNT_MODE_PATTERN,
+    CURSOR,
+    MODULE_TYPE_ID,
+    ORDER_BY,
+)
 from app.routers.admin.crud.module_types import module_types
-from app.routers.admin.crud.operations import operations
-from app.routers.admin.schemas import ModuleType, ModuleTypeAdd, ModuleTypeList
+from app.routers.admin.schemas import (
+    ModuleType,
+    ModuleTypeAdd,
+    ModuleTypeList,
+    Principal,
+)
 
 router = APIRouter(prefix="/module-types", tags=["Module Types"])
 
 
 @router.get("", response_model=ModuleTypeList)
 def get_module_types(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(get_principal),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="List Admin Users"
-    # )
     data = module_types.get_module_types(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
 
 @router.get("/{module_type_id}", response_model=ModuleType)
 def get_module_type(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     module_type_id: str = Path(title=MODULE_TYPE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = module_types.get_module_type(db, module_type_id=module_type_id)
     return data
 
@@ -50,13 +62,9 @@ def get_module_type(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=ModuleType)
 def add_module_type(
     request: ModuleTypeAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = module_types.add_module_type(db, request=request)
     return data
 
@@ -64,14 +72,10 @@ def add_module_type(
 @router.put("/{module_type_id}", response_model=ModuleType)
 def update_module_type(
     request: ModuleTypeAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     module_type_id: str = Path(title=MODULE_TYPE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = module_types.update_module_type(
         db, module_type_id=module_type_id, request=request
     )
@@ -80,13 +84,9 @@ def update_module_type(
 
 @router.delete("/{module_type_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_module_type(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     module_type_id: str = Path(title=MODULE_TYPE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    # )
     module_types.delete_module_type(db, module_type_id=module_type_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -8,11 +8,17 @@ from app.libs.constants import (
     MODULE_TYPE_NOT_FOUND,
     PROJECT_NOT_FOUND,
 )
-from app.libs.utils import generate_id, list_data, now
+from app.libs.export import export_rows
+from app.libs.utils import eager_options, generate_id, list_data, now
 from app.models import ModuleModel
+from app.routers.admin.crud.common.counters import (
+    count_new,
+    drop_counters,
+    move_counters,
+)
 from app.routers.admin.crud.module_types.module_types import get_module_type
 from app.routers.admin.crud.projects.projects import get_project
-from app.routers.admin.schemas import ModuleAdd
+from app.routers.admin.schemas import Module, ModuleAdd
 
 
 def get_modules(
@@ -22,6 +28,8 @@ def get_modules(
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     data = list_data(
         db,
@@ -31,12 +39,36 @@ def get_modules(
         sort_by=sort_by,
         order=order,
         search=search,
+        cursor=cursor,
+        count_mode=count_mode,
+        schema=Module,
     )
     return data
 
 
+def export_modules(
+    format: str,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    return export_rows(
+        ModuleModel,
+        schema=Module,
+        format=format,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+    )
+
+
 def get_module(db: Session, module_id: str):
-    module = db.query(ModuleModel).filter_by(id=module_id, is_deleted=False).first()
+    module = (
+        db.query(ModuleModel)
+        .options(*eager_options(ModuleModel, Module))
+        .filter_by(id=module_id, is_deleted=False)
+        .first()
+    )
     if not module:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=MODULE_NOT_FOUND
@@ -67,6 +99,7 @@ def add_module(db: Session, request: ModuleAdd):
     # Add the module
     module = ModuleModel(id=generate_id(), **request.dict())
     db.add(module)
+    count_new(db, module_ids=[module.id])
     db.commit()
     db.refresh(module)
     return module
@@ -80,6 +113,8 @@ def update_module(db: Session, module_id: str, request: ModuleAdd):
     module = get_module(db, module_id)
 
     # Update the module
+    if module.project_id != request.project_id:
+        move_counters(db, module_id=module_id, project_id=request.project_id)
     module.name = request.name
     module.description = request.description
     module.project_id = request.project_id
@@ -97,6 +132,7 @@ def delete_module(db: Session, module_id: str):
 
     # Delete the module
     module.is_deleted = True
+    drop_counters(db, module_ids=[module_id])
     db.commit()
     db.refresh(module)
     return module
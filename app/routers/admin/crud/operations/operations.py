@@ -1,8 +1,169 @@
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+from typing import FrozenSet, Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.models import AdminUserRoleModel, OperationModel, RoleModel, RoleOperationModel
-from app.routers.admin.crud.admin_users.admin_users import is_super_admin
+from app.config import MENU_CACHE_SIZE, OPERATION_TREE_TTL, PERMISSION_MATRIX_TTL
+from app.libs.cache import TTLCache
+from app.models import OperationModel, RoleModel, RoleOperationModel
+from app.routers.admin.crud.admin_users.admin_users import load_principal
+from app.routers.admin.schemas import Principal
+
+
+class PermissionMatrix:
+    """In-process role_id -> frozenset of operation slugs.
+
+    Role writes in this process call invalidate(), which also bumps the
+    version. Other worker processes pick the change up once their copy is
+    older than the TTL. A load that overlaps an invalidate() is returned to
+    its caller but not kept, it may have read the roles before the write.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.version = 0
+        self._roles = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> dict:
+        version = self.version
+        rows = (
+            db.query(RoleOperationModel.role_id, OperationModel.slug)
+            .join(OperationModel, OperationModel.id == RoleOperationModel.operation_id)
+            .join(RoleModel, RoleModel.id == RoleOperationModel.role_id)
+            .filter(RoleModel.is_deleted == False)
+            .all()
+        )
+        slugs = {}
+        for role_id, slug in rows:
+            slugs.setdefault(role_id, set()).add(slug)
+        roles = {
+            role_id: frozenset(role_slugs) for role_id, role_slugs in slugs.items()
+        }
+        with self._lock:
+            if self.version == version:
+                self._roles = roles
+                self._loaded_at = time.monotonic()
+                self.version += 1
+        return roles
+
+    def invalidate(self):
+        with self._lock:
+            self._roles = None
+            self.version += 1
+
+    def get(self, db: Session, role_id: Optional[str]) -> FrozenSet[str]:
+        roles = self._roles
+        if roles is None or time.monotonic() - self._loaded_at > self.ttl:
+            # The dict just built, self._roles may already be invalidated again
+            roles = self.load(db)
+        return roles.get(role_id, frozenset())
+
+
+OperationTreeData = namedtuple(
+    "OperationTreeData", ["version", "headings", "body", "etag"]
+)
+
+
+class OperationTree:
+    """Precomputed heading -> operations tree with its serialized body.
+
+    Operations are seeded outside the app, so like the permission matrix the
+    tree is rebuilt once it is older than the TTL, or on the next request
+    after invalidate(). The version moves on invalidate() and when a reload
+    finds a different tree, so menus cached on it survive a reload that
+    found nothing new. As with the permission matrix, a load that overlaps
+    an invalidate() is not kept.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.version = 0
+        self._data = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> OperationTreeData:
+        version = self.version
+        rows = db.query(OperationModel).order_by(OperationModel.order_index).all()
+        headings = []
+        children = {}
+        for row in rows:
+            if row.parent_id == "0":
+                headings.append(row)
+            else:
+                children.setdefault(row.parent_id, []).append(row)
+
+        tree = [
+            {
+                "id": heading.id,
+                "name": heading.name,
+                "slug": heading.slug,
+                "operations": [
+                    {"id": row.id, "name": row.name, "slug": row.slug}
+                    for row in children.get(heading.id, [])
+                ],
+            }
+            for heading in headings
+        ]
+        body = [
+            {
+                "id": heading["id"],
+                "name": heading["name"],
+                "operations": [
+                    {"id": row["id"], "name": row["name"]}
+                    for row in heading["operations"]
+                ],
+            }
+            for heading in tree
+        ]
+        body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+        with self._lock:
+            if self.version != version:
+                # Invalidated while loading, good enough for this request only
+                return OperationTreeData(
+                    version=version, headings=tree, body=body, etag=etag
+                )
+            if self._data is not None and self._data.headings != tree:
+                self.version += 1
+            # Replaced as a whole so readers never mix two loads
+            self._data = OperationTreeData(
+                version=self.version, headings=tree, body=body, etag=etag
+            )
+            self._loaded_at = time.monotonic()
+            return self._data
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+            self.version += 1
+
+    def get(self, db: Session) -> OperationTreeData:
+        data = self._data
+        if data is None or time.monotonic() - self._loaded_at > self.ttl:
+            data = self.load(db)
+        return data
+
+
+permission_matrix = PermissionMatrix(ttl=PERMISSION_MATRIX_TTL)
+
+operation_tree = OperationTree(ttl=OPERATION_TREE_TTL)
+
+# Menu payload per role
+menu_cache = TTLCache(maxsize=MENU_CACHE_SIZE, ttl=PERMISSION_MATRIX_TTL)
+
+
+def has_operation(db: Session, principal: Principal, operation: str) -> bool:
+    if principal.is_super_admin:
+        return True
+    return operation in permission_matrix.get(db, role_id=principal.role_id)
 
 
 def get_operation(db: Session, operation_id: str):
@@ -12,81 +173,53 @@ def get_operation(db: Session, operation_id: str):
     return db_operation
 
 
-def get_user_operation(db: Session, admin_user_id: str):
-    super_admin = is_super_admin(db, admin_user_id=admin_user_id)
-    headings = (
-        db.query(OperationModel)
-        .filter(OperationModel.parent_id == "0")
-        .order_by(OperationModel.order_index)
-        .all()
+def get_user_operation(db: Session, principal: Principal):
+    # Keyed by both versions so role writes or reseeded operations never
+    # serve a stale menu. They are read before the data, which is then at
+    # least as new as the key even if an invalidate() lands in between
+    cache_key = (
+        principal.role_id,
+        principal.is_super_admin,
+        permission_matrix.version,
+        operation_tree.version,
     )
+    permitted = None
+    if not principal.is_super_admin:
+        permitted = permission_matrix.get(db, role_id=principal.role_id)
+    tree = operation_tree.get(db)
+
+    data = menu_cache.get(cache_key)
+    if data is not None:
+        return data
+
     all_operations = []
     allowed_menu = []
-    for heading in headings:
-        if super_admin:
-            rows = (
-                db.query(OperationModel)
-                .filter(OperationModel.parent_id == heading.id)
-                .order_by(OperationModel.order_index)
-                .all()
-            )
-        else:
-            rows = (
-                db.query(OperationModel)
-                .filter(OperationModel.parent_id == heading.id)
-                .order_by(OperationModel.order_index)
-                .join(RoleOperationModel)
-                .join(RoleModel)
-                .join(AdminUserRoleModel)
-                .filter(AdminUserRoleModel.admin_user_id == admin_user_id)
-                .all()
-            )
-        operations = []
-        for row in rows:
-            operations.append(row.slug)
+    for heading in tree.headings:
+        operations = [
+            row["slug"]
+            for row in heading["operations"]
+            if permitted is None or row["slug"] in permitted
+        ]
         all_operations.extend(operations)
         if len(operations) == 0:
             continue
-        allowed_menu.append(heading.slug)
+        allowed_menu.append(heading["slug"])
     data = {"operations": all_operations, "menu": allowed_menu}
+    menu_cache.set(cache_key, data)
     return data
 
 
-def get_all_operations(db: Session):
-    headings = (
-        db.query(OperationModel)
-        .filter(OperationModel.parent_id == "0")
-        .order_by(OperationModel.order_index)
-        .all()
-    )
-    for heading in headings:
-        operations = (
-            db.query(OperationModel)
-            .filter(OperationModel.parent_id == heading.id)
-            .order_by(OperationModel.order_index)
-            .all()
-        )
-        heading.operations = operations
-    return headings
+def get_all_operations(db: Session) -> OperationTreeData:
+    return operation_tree.get(db)
 
 
 def verify_admin_user_operation(db: Session, admin_user_id: str, operation: str):
-    super_admin = is_super_admin(db, admin_user_id=admin_user_id)
-    if not super_admin:
-        db_operations = (
-            db.query(AdminUserRoleModel)
-            .filter(AdminUserRoleModel.admin_user_id == admin_user_id)
-            .join(RoleModel)
-            .join(RoleOperationModel)
-            .join(OperationModel)
-            .filter(OperationModel.slug == operation)
-            .first()
+    principal = load_principal(db, admin_user_id=admin_user_id)
+    if principal is None or not has_operation(db, principal, operation):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You don't have permission.",
         )
-        if db_operations is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="You don't have permission.",
-            )
 
 
 def get_modules(db: Session):
@@ -1,12 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.routers.admin.crud.admin_users import admin_users
+from app.dependencies import get_db, get_principal
+from app.libs.utils import etag_matches
 from app.routers.admin.crud.operations import operations
-from app.routers.admin.schemas import RoleOperation
+from app.routers.admin.schemas import Principal, RoleOperation
 
 router = APIRouter(
     prefix="/operations",
@@ -15,14 +15,21 @@ router = APIRouter(
 
 
 @router.get("")
-def get_my_operation(token: str = Header(None), db: Session = Depends(get_db)):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    data = operations.get_user_operation(db, admin_user_id=db_admin_user.id)
+def get_my_operation(
+    principal: Principal = Depends(get_principal), db: Session = Depends(get_db)
+):
+    data = operations.get_user_operation(db, principal=principal)
     return data
 
 
 @router.get("/all", response_model=List[RoleOperation])
-def get_all_operations(token: str = Header(None), db: Session = Depends(get_db)):
-    admin_users.verify_token(db, token=token)
-    data = operations.get_all_operations(db)
-    return data
+def get_all_operations(
+    if_none_match: Optional[str] = Header(None),
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    tree = operations.get_all_operations(db)
+    headers = {"ETag": tree.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, tree.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=tree.body, media_type="application/json", headers=headers)
@@ -4,10 +4,16 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.libs.constants import ADMIN_USER_NOT_FOUND, PROJECT_NOT_FOUND
-from app.libs.utils import generate_id, list_data, now
+from app.libs.export import export_rows
+from app.libs.utils import eager_options, generate_id, insert_ignore, list_data, now
 from app.models import ProjectModel, ProjectUserModel
-from app.routers.admin.crud.admin_users.admin_users import get_admin_user
+from app.routers.admin.crud.admin_users.admin_users import (
+    get_admin_user,
+    get_admin_users_by_ids,
+)
+from app.routers.admin.crud.common.counters import drop_counters
 from app.routers.admin.schemas import (
+    Project,
     ProjectAdd,
     ProjectStatusChange,
     ProjectUser,
@@ -22,6 +28,8 @@ def get_projects(
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     data = list_data(
         db,
@@ -31,12 +39,36 @@ def get_projects(
         sort_by=sort_by,
         order=order,
         search=search,
+        cursor=cursor,
+        count_mode=count_mode,
+        schema=Project,
     )
     return data
 
 
+def export_projects(
+    format: str,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    return export_rows(
+        ProjectModel,
+        schema=Project,
+        format=format,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+    )
+
+
 def get_project(db: Session, project_id: str):
-    project = db.query(ProjectModel).filter_by(id=project_id, is_deleted=False).first()
+    project = (
+        db.query(ProjectModel)
+        .options(*eager_options(ProjectModel, Project))
+        .filter_by(id=project_id, is_deleted=False)
+        .first()
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=PROJECT_NOT_FOUND
@@ -97,7 +129,7 @@ def update_project(db: Session, project_id: str, request: ProjectAdd):
     db.commit()
     db.refresh(project)
     return project
-            
+
 
 def delete_project(db: Session, project_id: str):
     # Fetch the project
@@ -105,6 +137,7 @@ def delete_project(db: Session, project_id: str):
 
     # Delete the project
     project.is_deleted = True
+    drop_counters(db, project_ids=[project_id])
     db.commit()
     db.refresh(project)
     return project
@@ -120,32 +153,33 @@ def change_status(db: Session, request: ProjectStatusChange):
 
 
 def assign_user(db: Session, request: ProjectUserAssign) -> ProjectUser:
-    # Iterate through the list of admin_user_ids in the request
-    for admin_user_id in request.admin_user_ids:
-        id = generate_id()
-        project_user = ProjectUserModel(
-            id=id, project_id=request.project_id, admin_user_id=admin_user_id
-        )
-        db.add(project_user)
-        db.commit()
-        db.refresh(project_user)
-
-    # Retrieve the admin_users based on their ids and create a list
-    admin_users = [
-        get_admin_user(db, admin_user_id) for admin_user_id in request.admin_user_ids
+    project = get_project(db, request.project_id)
+    admin_users = get_admin_users_by_ids(db, request.admin_user_ids)
+
+    # One multi-row insert, memberships that already exist are skipped by
+    # the unique (project_id, admin_user_id) constraint
+    rows = [
+        {
+            "id": generate_id(),
+            "project_id": request.project_id,
+            "admin_user_id": admin_user.id,
+        }
+        for admin_user in admin_users
     ]
+    db.execute(insert_ignore(ProjectUserModel), rows)
 
-    # Set the admin_users list to the project_user instance
-    project_user.admin_users = admin_users
-    return project_user
+    # Serialized before the commit expires the loaded rows, otherwise every
+    # admin user is selected again
+    data = ProjectUser.model_validate(
+        {"project": project, "admin_users": admin_users}, from_attributes=True
+    )
+    db.commit()
+    return data
 
 
 def remove_user(db: Session, request: ProjectUserAssign):
-    for admin_user_id in request.admin_user_ids:
-        project_user = (
-            db.query(ProjectUserModel)
-            .filter_by(project_id=request.project_id, admin_user_id=admin_user_id)
-            .first()
-        )
-        db.delete(project_user)
-        db.commit()
+    db.query(ProjectUserModel).filter(
+        ProjectUserModel.project_id == request.project_id,
+        ProjectUserModel.admin_user_id.in_(request.admin_user_ids),
+    ).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,85 @@
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.libs import reports
+from app.libs.constants import REPORT_NOT_FOUND, REPORT_NOT_READY
+from app.models import ModuleModel, ProjectStatusCounterModel
+from app.models.issues.models import IssueStatusEnum
+from app.routers.admin.crud.common.counters import ISSUE, MODULE, TASK
+from app.routers.admin.crud.projects.projects import get_project
+from app.routers.admin.crud.projects.summary import empty_summary
+
+
+def report_data(db: Session, project_id: str) -> dict:
+    """Everything the report shows, as plain data a worker process can take.
+
+    Read from the project, its live modules and the status counters, so it
+    is two queries however many tasks and issues the project has.
+    """
+    project = get_project(db, project_id)
+    summary = empty_summary(project_id)
+    modules = {
+        module.id: {
+            "name": module.name,
+            "tasks": dict(summary["tasks"]),
+            "open_issues": 0,
+        }
+        for module in db.query(ModuleModel.id, ModuleModel.name)
+        .filter(ModuleModel.project_id == project_id, ModuleModel.is_deleted == False)
+        .order_by(ModuleModel.name, ModuleModel.id)
+    }
+    counters = db.query(ProjectStatusCounterModel).filter(
+        ProjectStatusCounterModel.project_id == project_id
+    )
+    for counter in counters:
+        module = modules.get(counter.module_id)
+        if module is None:
+            continue
+        if counter.kind == MODULE:
+            summary["modules"] += counter.total
+        elif counter.kind == TASK:
+            summary["tasks"][counter.status] += counter.total
+            module["tasks"][counter.status] += counter.total
+        elif counter.kind == ISSUE:
+            summary["issues"][counter.status][counter.priority] += counter.total
+            if counter.status == IssueStatusEnum.OPEN.name:
+                module["open_issues"] += counter.total
+
+    return {
+        "project": {
+            "name": project.name,
+            "status": project.status.name,
+            "start_date": project.start_date.isoformat(),
+            "end_date": project.end_date.isoformat(),
+            "manager": project.manager.name if project.manager else "",
+        },
+        "summary": summary,
+        "modules": list(modules.values()),
+    }
+
+
+def request_report(db: Session, project_id: str) -> dict:
+    job_id = reports.submit_report(project_id, report_data(db, project_id))
+    return get_report_job(job_id)
+
+
+def get_report_job(job_id: str) -> dict:
+    job = reports.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=REPORT_NOT_FOUND
+        )
+    return {"id": job_id, "project_id": job_id[:36], **job}
+
+
+def get_report_file(job_id: str) -> str:
+    job = get_report_job(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=job["error"]
+        )
+    if job["status"] != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=REPORT_NOT_READY
+        )
+    return reports.report_path(job_id)
@@ -1,20 +1,34 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import ORDER_BY, PROJECT_ID
-from app.routers.admin.crud.admin_users import admin_users
-from app.routers.admin.crud.operations import operations
-from app.routers.admin.crud.projects import projects
+from app.dependencies import get_db, get_principal
+from app.libs.constants import (
+    COUNT_MODE,
+    COUNT_MODE_PATTERN,
+    CURSOR,
+    EXPORT_FORMAT,
+    EXPORT_FORMAT_PATTERN,
+    ORDER_BY,
+    PROJECT_ID,
+    REPORT_JOB_ID,
+    REPORT_JOB_ID_PATTERN,
+)
+from app.libs.export import EXPORT_MEDIA_TYPES
+from app.routers.admin.crud.projects import projects, reports, summary, tree
 from app.routers.admin.schemas import (
+    Principal,
     Project,
     ProjectAdd,
     ProjectList,
     ProjectStatusChange,
+    ProjectSummary,
+    ProjectTree,
     ProjectUser,
     ProjectUserAssign,
+    ReportJob,
 )
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
@@ -22,48 +36,129 @@ router = APIRouter(prefix="/projects", tags=["Projects"])
 
 @router.get("", response_model=ProjectList)
 def get_projects(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(get_principal),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="List Admin Users"
-    # )
     data = projects.get_projects(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
 
+@router.get("/export")
+def export_projects(
+    principal: Principal = Depends(get_principal),
+    format: str = Query(
+        "ndjson", pattern=EXPORT_FORMAT_PATTERN, description=EXPORT_FORMAT
+    ),
+    sort_by: Optional[str] = Query(None, max_length=50),
+    order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
+    search: Optional[str] = Query(None, max_length=50),
+):
+    rows = projects.export_projects(
+        format=format, sort_by=sort_by, order=order, search=search
+    )
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=projects.{format}"},
+    )
+
+
+@router.get("/summary", response_model=List[ProjectSummary])
+def get_projects_summary(
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    data = summary.get_projects_summary(db)
+    return data
+
+
+@router.get("/reports/{job_id}", response_model=ReportJob)
+def get_report_job(
+    principal: Principal = Depends(get_principal),
+    job_id: str = Path(title=REPORT_JOB_ID, pattern=REPORT_JOB_ID_PATTERN),
+):
+    data = reports.get_report_job(job_id)
+    return data
+
+
+@router.get("/reports/{job_id}/download")
+def download_report(
+    principal: Principal = Depends(get_principal),
+    job_id: str = Path(title=REPORT_JOB_ID, pattern=REPORT_JOB_ID_PATTERN),
+):
+    path = reports.get_report_file(job_id)
+    return FileResponse(path, media_type="application/pdf", filename=f"{job_id}.pdf")
+
+
 @router.get("/{project_id}", response_model=Project)
 def get_project(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = projects.get_project(db, project_id=project_id)
     return data
 
 
+@router.get("/{project_id}/summary", response_model=ProjectSummary)
+def get_project_summary(
+    principal: Principal = Depends(get_principal),
+    project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
+    db: Session = Depends(get_db),
+):
+    data = summary.get_project_summary(db, project_id=project_id)
+    return data
+
+
+@router.get("/{project_id}/tree", response_model=ProjectTree)
+def get_project_tree(
+    principal: Principal = Depends(get_principal),
+    project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
+    db: Session = Depends(get_db),
+):
+    # Streamed, response_model only documents the body
+    chunks = tree.get_project_tree(db, project_id=project_id)
+    return StreamingResponse(chunks, media_type="application/json")
+
+
+@router.post(
+    "/{project_id}/report",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ReportJob,
+)
+def request_report(
+    principal: Principal = Depends(get_principal),
+    project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
+    db: Session = Depends(get_db),
+):
+    data = reports.request_report(db, project_id=project_id)
+    return data
+
+
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=Project)
 def add_project(
     request: ProjectAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = projects.add_project(db, request=request)
     return data
 
@@ -71,28 +166,31 @@ def add_project(
 @router.put("/{project_id}", response_model=Project)
 def update_project(
     request: ProjectAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = projects.update_project(db, project_id=project_id, request=request)
     return data
 
 
+# Declared before /{project_id} so the path is not read as a project id
+@router.delete("/remove_project")
+def remove_user(
+    request: ProjectUserAssign,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    projects.remove_user(db, request=request)
+    return "User removed"
+
+
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     project_id: str = Path(title=PROJECT_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    # )
     projects.delete_project(db, project_id=project_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -100,13 +198,9 @@ def delete_project(
 @router.put("/{project_id}/status")
 def change_status(
     request: ProjectStatusChange,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     projects.change_status(db, request=request)
     return f"Project Status Changed to {request.status.name}"
 
@@ -116,26 +210,8 @@ def change_status(
 )
 def assign_user(
     request: ProjectUserAssign,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = projects.assign_user(db, request=request)
     return data
-
-
-@router.delete("/remove_project")
-def remove_user(
-    request: ProjectUserAssign,
-    token: str = Header(None),
-    db: Session = Depends(get_db),
-):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
-    projects.remove_user(db, request=request)
-    return "User removed"
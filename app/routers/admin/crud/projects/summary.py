@@ -0,0 +1,111 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import SUMMARY_CACHE_SIZE, SUMMARY_CACHE_TTL
+from app.libs.cache import TTLCache
+from app.libs.constants import PROJECT_NOT_FOUND
+from app.libs.counts import on_table_written
+from app.models import ProjectModel, ProjectStatusCounterModel
+from app.models.issues.models import IssuePriorityEnum, IssueStatusEnum
+from app.models.tasks.models import TaskStatusEnum
+from app.routers.admin.crud.common.counters import ISSUE, MODULE, TASK
+
+# Summaries keyed by project id, None for the all projects summary
+summary_cache = TTLCache(maxsize=SUMMARY_CACHE_SIZE, ttl=SUMMARY_CACHE_TTL)
+
+SUMMARY_TABLES = {"projects", "modules", "tasks", "issues"}
+
+
+@on_table_written
+def invalidate_summaries(table: str):
+    if table in SUMMARY_TABLES:
+        summary_cache.clear()
+
+
+def empty_summary(project_id: str) -> dict:
+    return {
+        "project_id": project_id,
+        "modules": 0,
+        "tasks": {task_status.name: 0 for task_status in TaskStatusEnum},
+        "issues": {
+            issue_status.name: {priority.name: 0 for priority in IssuePriorityEnum}
+            for issue_status in IssueStatusEnum
+        },
+    }
+
+
+def summary_query(project_id: Optional[str] = None):
+    """(project_id, kind, status, priority, total) read from the counters.
+
+    The counters hold one row per module and status, so a summary reads a
+    handful of rows however many tasks and issues there are. The projects
+    select makes projects without counters show up with zero counts.
+    """
+    projects = select(
+        ProjectModel.id.label("project_id"),
+        literal("project").label("kind"),
+        literal("").label("status"),
+        literal("").label("priority"),
+        literal(0).label("total"),
+    ).where(ProjectModel.is_deleted == False)
+    counters = select(
+        ProjectStatusCounterModel.project_id,
+        ProjectStatusCounterModel.kind,
+        ProjectStatusCounterModel.status,
+        ProjectStatusCounterModel.priority,
+        func.sum(ProjectStatusCounterModel.total),
+    ).group_by(
+        ProjectStatusCounterModel.project_id,
+        ProjectStatusCounterModel.kind,
+        ProjectStatusCounterModel.status,
+        ProjectStatusCounterModel.priority,
+    )
+    if project_id is not None:
+        projects = projects.where(ProjectModel.id == project_id)
+        counters = counters.where(ProjectStatusCounterModel.project_id == project_id)
+    return union_all(projects, counters)
+
+
+def load_summaries(db: Session, project_id: Optional[str] = None) -> dict:
+    rows = db.execute(summary_query(project_id)).all()
+    summaries = {
+        row.project_id: empty_summary(row.project_id)
+        for row in rows
+        if row.kind == "project"
+    }
+    for row in rows:
+        summary = summaries.get(row.project_id)
+        if summary is None:
+            # Leftover counters of a deleted project
+            continue
+        total = int(row.total)
+        if row.kind == MODULE:
+            summary["modules"] = total
+        elif row.kind == TASK:
+            summary["tasks"][row.status] = total
+        elif row.kind == ISSUE:
+            summary["issues"][row.status][row.priority] = total
+    return summaries
+
+
+def get_project_summary(db: Session, project_id: str) -> dict:
+    summary = summary_cache.get(project_id)
+    if summary is None:
+        summary = load_summaries(db, project_id=project_id).get(project_id)
+        if summary is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=PROJECT_NOT_FOUND
+            )
+        summary_cache.set(project_id, summary)
+    return summary
+
+
+def get_projects_summary(db: Session) -> list:
+    summaries = summary_cache.get(None)
+    if summaries is None:
+        summaries = list(load_summaries(db).values())
+        summary_cache.set(None, summaries)
+    return summaries
@@ -0,0 +1,77 @@
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import TREE_BATCH_SIZE
+from app.database import SessionLocal
+from app.libs.utils import paginate
+from app.models import IssueModel, ModuleModel, TaskModel
+from app.routers.admin.crud.projects.projects import get_project
+from app.routers.admin.schemas import ModuleNode, Project
+
+
+def tree_query(db: Session, project_id: str):
+    """Live modules of a project with their live tasks and issues.
+
+    One SELECT per batch of modules, then one SELECT ... IN per level for
+    their tasks and issues, however many rows there are.
+    """
+    return (
+        db.query(ModuleModel)
+        .options(
+            joinedload(ModuleModel.module_type),
+            selectinload(
+                ModuleModel.task.and_(TaskModel.is_deleted == False)
+            ).selectinload(TaskModel.issue.and_(IssueModel.is_deleted == False)),
+        )
+        .filter(ModuleModel.project_id == project_id, ModuleModel.is_deleted == False)
+    )
+
+
+def stream_tree(header: str, project_id: str, batch_size: int):
+    # Own session, the stream outlives the request handler
+    db = SessionLocal()
+    try:
+        yield header.encode("utf-8")
+        separator = ""
+        cursor = None
+        while True:
+            # Keyset batches rather than yield_per: on SQLAlchemy 2.0.20 the
+            # nested selectin loads inherit yield_per and fail on unique()
+            page = paginate(
+                tree_query(db, project_id),
+                sort_column=ModuleModel.created_at,
+                id_column=ModuleModel.id,
+                descending=False,
+                start=0,
+                limit=batch_size,
+                cursor=cursor,
+                count_mode="none",
+            )
+            chunk = [
+                ModuleNode.model_validate(
+                    module, from_attributes=True
+                ).model_dump_json()
+                for module in page.list
+            ]
+            if chunk:
+                yield (separator + ",".join(chunk)).encode("utf-8")
+                separator = ","
+            # Done with this batch, let the session drop it
+            db.expunge_all()
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        yield b"]}"
+    finally:
+        db.close()
+
+
+def get_project_tree(db: Session, project_id: str, batch_size: int = TREE_BATCH_SIZE):
+    """The project followed by its modules -> tasks -> issues, as JSON chunks.
+
+    The project is looked up first so a missing one is still a 404, the
+    modules are then written out a batch at a time as they load.
+    """
+    project = get_project(db, project_id)
+    header = Project.model_validate(project, from_attributes=True)
+    header = header.model_dump_json()[:-1] + ',"modules":['
+    return stream_tree(header, project_id, batch_size)
@@ -1,23 +1,22 @@
 from typing import List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.libs.constants import ROLE_NOT_FOUND
-from app.libs.utils import generate_id, now
+from app.libs.utils import ListQuery, generate_id, now, paginate
 from app.models import OperationModel, RoleModel, RoleOperationModel
-from app.routers.admin.crud.operations.operations import get_operation
+from app.routers.admin.crud.operations.operations import permission_matrix
 from app.routers.admin.schemas import OperationMaster, RoleAdd
 
 
-def get_roles(
+def build_roles_query(
     db: Session,
-    start: int,
-    limit: int,
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
-):
+) -> ListQuery:
     query = db.query(RoleModel).filter(RoleModel.is_deleted == False)
 
     if search:
@@ -25,16 +24,39 @@ def get_roles(
         query = query.filter(RoleModel.name.like(text))
 
     if sort_by == "name":
-        if order == "desc":
-            query = query.order_by(RoleModel.name.desc())
-        else:
-            query = query.order_by(RoleModel.name)
+        column = RoleModel.name
+        descending = order == "desc"
     else:
-        query = query.order_by(RoleModel.updated_at.desc())
+        column = RoleModel.updated_at
+        descending = True
+    return ListQuery(
+        query=query, sort_column=column, descending=descending, ranked=False
+    )
+
 
-    results = query.offset(start).limit(limit).all()
-    count = query.count()
-    data = {"count": count, "list": results}
+def get_roles(
+    db: Session,
+    start: int,
+    limit: int,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
+):
+    list_query = build_roles_query(db, sort_by=sort_by, order=order, search=search)
+    page = paginate(
+        list_query.query,
+        sort_column=list_query.sort_column,
+        id_column=RoleModel.id,
+        descending=list_query.descending,
+        start=start,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode,
+        filtered=bool(search),
+    )
+    data = {"count": page.count, "list": page.list, "next_cursor": page.next_cursor}
     return data
 
 
@@ -56,18 +78,38 @@ def get_role_by_name(db: Session, name: str):
     )
 
 
-def add_role_operations(db: Session, role_id: str, operations: List[str]):
-    for operation in operations:
-        db_operation = get_operation(db, operation_id=operation)
-        if db_operation is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Operation not found"
-            )
-        db_role_operation = RoleOperationModel(
-            id=generate_id(), role_id=role_id, operation_id=operation
+def validate_operations(db: Session, operations: List[str]) -> set:
+    # The whole list checked with one IN query, every unknown id is reported
+    operations = set(operations)
+    known = {
+        operation_id
+        for (operation_id,) in db.query(OperationModel.id).filter(
+            OperationModel.id.in_(operations)
         )
-        db.add(db_role_operation)
-    db.commit()
+    }
+    unknown = operations - known
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Operation not found: {', '.join(sorted(unknown))}",
+        )
+    return operations
+
+
+def insert_role_operations(db: Session, role_id: str, operations: set):
+    rows = [
+        {"id": generate_id(), "role_id": role_id, "operation_id": operation}
+        for operation in operations
+    ]
+    # One multi-row insert, the commit is left to the caller
+    if rows:
+        db.execute(insert(RoleOperationModel), rows)
+
+
+def add_role_operations(db: Session, role_id: str, operations: List[str]):
+    insert_role_operations(
+        db, role_id=role_id, operations=validate_operations(db, operations)
+    )
 
 
 def get_role_by_id(db: Session, role_id: str):
@@ -118,13 +160,21 @@ def add_role(db: Session, role: RoleAdd) -> RoleModel:
         )
     db_role = RoleModel(id=generate_id(), slug=name, name=name)
     db.add(db_role)
+    # The role row has to exist before the bulk insert references it
+    db.flush()
     add_role_operations(db, role_id=db_role.id, operations=role.operations)
     db.commit()
+    permission_matrix.invalidate()
     return get_role_details(db=db, role_id=db_role.id)
 
 
-def delete_role_operations(db: Session, role_id: str):
-    db.query(RoleOperationModel).filter(RoleOperationModel.role_id == role_id).delete()
+def delete_role_operations(
+    db: Session, role_id: str, operations: Optional[List[str]] = None
+):
+    query = db.query(RoleOperationModel).filter(RoleOperationModel.role_id == role_id)
+    if operations is not None:
+        query = query.filter(RoleOperationModel.operation_id.in_(operations))
+    query.delete(synchronize_session=False)
 
 
 def update_role(db: Session, role_id: str, role: RoleAdd):
@@ -145,9 +195,21 @@ def update_role(db: Session, role_id: str, role: RoleAdd):
                 status_code=status.HTTP_409_CONFLICT, detail="Role already exist."
             )
     db_role.name = name
-    delete_role_operations(db, role_id=role_id)
-    add_role_operations(db, role_id=role_id, operations=role.operations)
+
+    # Only the difference to the stored operations is written
+    operations = validate_operations(db, role.operations)
+    existing = {
+        operation_id
+        for (operation_id,) in db.query(RoleOperationModel.operation_id).filter(
+            RoleOperationModel.role_id == role_id
+        )
+    }
+    removed = existing - operations
+    if removed:
+        delete_role_operations(db, role_id=role_id, operations=list(removed))
+    insert_role_operations(db, role_id=role_id, operations=operations - existing)
     db.commit()
+    permission_matrix.invalidate()
 
 
 def delete_role(db: Session, role_id: str):
@@ -165,3 +227,4 @@ def delete_role(db: Session, role_id: str):
     db_role.is_deleted = True
     db_role.updated_at = now()
     db.commit()
+    permission_matrix.invalidate()
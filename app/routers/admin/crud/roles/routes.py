@@ -1,34 +1,39 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import ORDER_BY, ROLE_ID
-from app.routers.admin.crud.admin_users import admin_users
-from app.routers.admin.crud.operations import operations
+from app.dependencies import get_db, get_principal, require
+from app.libs.constants import COUNT_MODE, COUNT_MODE_PATTERN, CURSOR, ORDER_BY, ROLE_ID
 from app.routers.admin.crud.roles import roles
-from app.routers.admin.schemas import Role, RoleAdd, RoleDetails, RoleList
+from app.routers.admin.schemas import Principal, Role, RoleAdd, RoleDetails, RoleList
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
 
 @router.get("", response_model=RoleList)
 def get_roles(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(require("List Roles")),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="List Roles"
-    )
     data = roles.get_roles(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
@@ -38,18 +43,19 @@ def get_roles(
     response_model=RoleDetails,
     status_code=status.HTTP_201_CREATED,
 )
-def add_role(role: RoleAdd, token: str = Header(None), db: Session = Depends(get_db)):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Add Role"
-    )
+def add_role(
+    role: RoleAdd,
+    principal: Principal = Depends(require("Add Role")),
+    db: Session = Depends(get_db),
+):
     data = roles.add_role(db, role=role)
     return data
 
 
 @router.get("/all", response_model=List[Role])
-def get_all_roles(token: str = Header(None), db: Session = Depends(get_db)):
-    admin_users.verify_token(db, token=token)
+def get_all_roles(
+    principal: Principal = Depends(get_principal), db: Session = Depends(get_db)
+):
     data = roles.get_all_roles(db)
     return data
 
@@ -57,13 +63,9 @@ def get_all_roles(token: str = Header(None), db: Session = Depends(get_db)):
 @router.get("/{role_id}", response_model=RoleDetails)
 def get_role(
     role_id: str = Path(title=ROLE_ID, min_length=36, max_length=36),
-    token: str = Header(None),
+    principal: Principal = Depends(require("Edit Role")),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Edit Role"
-    )
     data = roles.get_role_details(db, role_id=role_id)
     return data
 
@@ -71,27 +73,19 @@ def get_role(
 @router.put("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
 def update_role(
     role: RoleAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(require("Edit Role")),
     role_id: str = Path(title=ROLE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Edit Role"
-    )
     roles.update_role(db, role_id=role_id, role=role)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_role(
-    token: str = Header(None),
+    principal: Principal = Depends(require("Delete Role")),
     role_id: str = Path(title=ROLE_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    operations.verify_admin_user_operation(
-        db, admin_user_id=db_admin_user.id, operation="Delete Role"
-    )
     roles.delete_role(db, role_id=role_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
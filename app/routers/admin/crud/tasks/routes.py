@@ -1,48 +1,107 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
+from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.libs.constants import ORDER_BY, TASK_ID
-from app.routers.admin.crud.admin_users import admin_users
-from app.routers.admin.crud.operations import operations
+from app.dependencies import get_db, get_principal
+from app.libs.constants import (
+    COUNT_MODE,
+    COUNT_MODE_PATTERN,
+    CURSOR,
+    EXPORT_FORMAT,
+    EXPORT_FORMAT_PATTERN,
+    ORDER_BY,
+    TASK_ID,
+)
+from app.libs.export import EXPORT_MEDIA_TYPES
 from app.routers.admin.crud.tasks import tasks
-from app.routers.admin.schemas import Task, TaskAdd, TaskList, TaskStatusChange
+from app.routers.admin.schemas import (
+    BulkResult,
+    Principal,
+    Task,
+    TaskAdd,
+    TaskBulkUpdate,
+    TaskList,
+    TaskStatusChange,
+)
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
 @router.get("", response_model=TaskList)
 def get_tasks(
-    token: str = Header(None),
-    start: int = 0,
-    limit: int = 10,
+    principal: Principal = Depends(get_principal),
+    start: int = Query(0, ge=0),
+    limit: int = Query(10, ge=0),
     sort_by: Optional[str] = Query(None, max_length=50),
     order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
     search: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[str] = Query(None, max_length=500, description=CURSOR),
+    count_mode: Optional[str] = Query(
+        None, pattern=COUNT_MODE_PATTERN, description=COUNT_MODE
+    ),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="List Admin Users"
-    # )
     data = tasks.get_tasks(
-        db, start=start, limit=limit, sort_by=sort_by, order=order, search=search
+        db,
+        start=start,
+        limit=limit,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     return data
 
 
+@router.get("/export")
+def export_tasks(
+    principal: Principal = Depends(get_principal),
+    format: str = Query(
+        "ndjson", pattern=EXPORT_FORMAT_PATTERN, description=EXPORT_FORMAT
+    ),
+    sort_by: Optional[str] = Query(None, max_length=50),
+    order: Optional[str] = Query(None, max_length=4, description=ORDER_BY),
+    search: Optional[str] = Query(None, max_length=50),
+):
+    rows = tasks.export_tasks(
+        format=format, sort_by=sort_by, order=order, search=search
+    )
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{format}"},
+    )
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=BulkResult)
+def add_tasks(
+    request: List[TaskAdd],
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    data = tasks.add_tasks(db, request=request)
+    return data
+
+
+@router.put("/bulk", response_model=BulkResult)
+def update_tasks(
+    request: List[TaskBulkUpdate],
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+    data = tasks.update_tasks(db, request=request)
+    return data
+
+
 @router.get("/{task_id}", response_model=Task)
 def get_task(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     task_id: str = Path(title=TASK_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = tasks.get_task(db, task_id=task_id)
     return data
 
@@ -50,13 +109,9 @@ def get_task(
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=Task)
 def add_task(
     request: TaskAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Add Admin User"
-    # )
     data = tasks.add_task(db, request=request)
     return data
 
@@ -64,28 +119,20 @@ def add_task(
 @router.put("/{task_id}", response_model=Task)
 def update_task(
     request: TaskAdd,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     task_id: str = Path(title=TASK_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     data = tasks.update_task(db, task_id=task_id, request=request)
     return data
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     task_id: str = Path(title=TASK_ID, min_length=36, max_length=36),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Delete Admin User"
-    # )
     tasks.delete_task(db, task_id=task_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -93,12 +140,8 @@ def delete_task(
 @router.put("/{task_id}/status")
 def change_status(
     request: TaskStatusChange,
-    token: str = Header(None),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    db_admin_user = admin_users.verify_token(db, token=token)
-    # operations.verify_admin_user_operation(
-    #     db, admin_user_id=db_admin_user.id, operation="Edit Admin User"
-    # )
     tasks.change_status(db, request=request)
     return f"Task Status Changed to {request.status.name}"
@@ -1,15 +1,25 @@
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.libs.constants import MODULE_NOT_FOUND, TASK_NOT_FOUND
-from app.libs.utils import generate_id, list_data
-from app.models.tasks import TaskModel
+from app.libs.export import export_rows
+from app.libs.utils import (
+    check_bulk_size,
+    eager_options,
+    existing_ids,
+    generate_id,
+    list_data,
+    now,
+)
+from app.models import ModuleModel, TaskModel
+from app.routers.admin.crud.common.counters import count_new, tracked
 from app.routers.admin.crud.module_types.module_types import get_module_type
 from app.routers.admin.crud.modules.modules import get_module
 from app.routers.admin.crud.projects.projects import get_project
-from app.routers.admin.schemas import TaskAdd, TaskStatusChange
+from app.routers.admin.schemas import Task, TaskAdd, TaskBulkUpdate, TaskStatusChange
 
 
 def get_tasks(
@@ -19,6 +29,8 @@ def get_tasks(
     sort_by: Optional[str] = None,
     order: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count_mode: Optional[str] = None,
 ):
     data = list_data(
         db,
@@ -28,12 +40,36 @@ def get_tasks(
         sort_by=sort_by,
         order=order,
         search=search,
+        cursor=cursor,
+        count_mode=count_mode,
+        schema=Task,
     )
     return data
 
 
+def export_tasks(
+    format: str,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    return export_rows(
+        TaskModel,
+        schema=Task,
+        format=format,
+        sort_by=sort_by,
+        order=order,
+        search=search,
+    )
+
+
 def get_task(db: Session, task_id: str):
-    task = db.query(TaskModel).filter_by(id=task_id, is_deleted=False).first()
+    task = (
+        db.query(TaskModel)
+        .options(*eager_options(TaskModel, Task))
+        .filter_by(id=task_id, is_deleted=False)
+        .first()
+    )
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=TASK_NOT_FOUND
@@ -52,6 +88,7 @@ def add_task(db: Session, request: TaskAdd):
     # Add the task
     task = TaskModel(id=generate_id(), **request.dict())
     db.add(task)
+    count_new(db, task_ids=[task.id])
     db.commit()
     db.refresh(task)
     return task
@@ -68,22 +105,80 @@ def update_task(db: Session, task_id: str, request: TaskAdd):
             status_code=status.HTTP_404_NOT_FOUND, detail=MODULE_NOT_FOUND
         )
 
-    # Update the task
-    task.name = request.name
-    task.description = request.description
-    task.module_id = request.module_id
+    # Update the task, moving it moves its counters along
+    with tracked(db, task_ids=[task_id]):
+        task.name = request.name
+        task.description = request.description
+        task.module_id = request.module_id
 
     db.commit()
     db.refresh(task)
     return task
 
 
+def add_tasks(db: Session, request: List[TaskAdd]):
+    check_bulk_size(request)
+    # Every parent checked with one IN query
+    module_ids = existing_ids(db, ModuleModel, [item.module_id for item in request])
+
+    rows = []
+    succeeded = []
+    failed = []
+    for index, item in enumerate(request):
+        if item.module_id not in module_ids:
+            failed.append({"index": index, "detail": MODULE_NOT_FOUND})
+            continue
+        # status, is_deleted and timestamps come from the column defaults
+        row = {"id": generate_id(), **item.dict()}
+        rows.append(row)
+        succeeded.append({"index": index, "id": row["id"]})
+
+    # One multi-row INSERT and one commit for the whole batch
+    if rows:
+        db.execute(insert(TaskModel), rows)
+        count_new(db, task_ids=[row["id"] for row in rows])
+        db.commit()
+    return {"succeeded": succeeded, "failed": failed}
+
+
+def update_tasks(db: Session, request: List[TaskBulkUpdate]):
+    check_bulk_size(request)
+    task_ids = existing_ids(db, TaskModel, [item.id for item in request])
+    module_ids = existing_ids(db, ModuleModel, [item.module_id for item in request])
+
+    rows = []
+    seen = set()
+    succeeded = []
+    failed = []
+    for index, item in enumerate(request):
+        if item.id not in task_ids:
+            detail = TASK_NOT_FOUND
+        elif item.id in seen:
+            detail = "Duplicate id."
+        elif item.module_id not in module_ids:
+            detail = MODULE_NOT_FOUND
+        else:
+            seen.add(item.id)
+            rows.append({**item.dict(), "updated_at": now()})
+            succeeded.append({"index": index, "id": item.id})
+            continue
+        failed.append({"index": index, "id": item.id, "detail": detail})
+
+    # Bulk UPDATE by primary key, executemany in one commit
+    if rows:
+        with tracked(db, task_ids=list(seen)):
+            db.execute(update(TaskModel), rows)
+        db.commit()
+    return {"succeeded": succeeded, "failed": failed}
+
+
 def delete_task(db: Session, task_id: str):
     # Fetch the task
     task = get_task(db, task_id)
 
     # Delete the task
-    task.is_deleted = True
+    with tracked(db, task_ids=[task_id]):
+        task.is_deleted = True
     db.commit()
 
 
@@ -92,5 +187,6 @@ def change_status(db: Session, request: TaskStatusChange):
     task = get_task(db, request.task_id)
 
     # Change the status
-    task.status = request.status
+    with tracked(db, task_ids=[task.id]):
+        task.status = request.status
     db.commit()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Annotated, Dict, List, Optional
 
 from email_validator import EmailNotValidError, validate_email
 from fastapi import HTTPException, status
@@ -36,8 +36,9 @@ class Role(BaseModel):
 
 
 class RoleList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[Role]
+    next_cursor: Optional[str] = None
 
 
 class OperationMaster(BaseModel):
@@ -119,8 +120,9 @@ class AdminUserAll(BaseModel):
 
 
 class AdminUserList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[AdminUserAll]
+    next_cursor: Optional[str] = None
 
 
 class AdminUserSmall(BaseModel):
@@ -160,7 +162,7 @@ class LoginResponse(BaseModel):
 
 class ForgotPassword(BaseModel):
     email: str = Field(min_length=3, max_length=100)
-    # captcha_token: str = Field(max_length=10000)
+    captcha_token: Optional[str] = Field(None, max_length=10000)
 
     # @field_validator("email")
     # @classmethod
@@ -254,6 +256,22 @@ class MyProfile(BaseModel):
         orm_mode = True
 
 
+class Principal(BaseModel):
+    id: str
+    name: str
+    email: str
+    role_id: Optional[str] = None
+    role_slug: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+        frozen = True
+
+    @property
+    def is_super_admin(self) -> bool:
+        return self.role_slug == "Super Admin"
+
+
 class ModuleType(BaseModel):
     id: str
     name: str
@@ -263,8 +281,9 @@ class ModuleType(BaseModel):
 
 
 class ModuleTypeList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[ModuleType]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -296,13 +315,28 @@ class Project(BaseModel):
 
 
 class ProjectList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[Project]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
 
 
+class ProjectSummary(BaseModel):
+    project_id: str
+    modules: int
+    tasks: Dict[str, int]
+    issues: Dict[str, Dict[str, int]]
+
+
+class ReportJob(BaseModel):
+    id: str
+    project_id: str
+    status: str = Field(description="pending | done | failed")
+    error: Optional[str] = None
+
+
 class ProjectAdd(BaseModel):
     name: str = Field(min_length=3, max_length=50)
     description: Optional[str] = Field(min_length=3, max_length=50)
@@ -328,8 +362,9 @@ class Module(BaseModel):
 
 
 class ModuleList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[Module]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -354,8 +389,9 @@ class Task(BaseModel):
 
 
 class TaskList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[Task]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -367,6 +403,10 @@ class TaskAdd(BaseModel):
     module_id: str = Field(min_length=36, max_length=36)
 
 
+class TaskBulkUpdate(TaskAdd):
+    id: str = Field(min_length=36, max_length=36)
+
+
 class TaskStatusChange(BaseModel):
     task_id: str = Field(min_length=36, max_length=36)
     status: TaskStatusEnum
@@ -385,8 +425,9 @@ class Issue(BaseModel):
 
 
 class IssuesList(BaseModel):
-    count: int
+    count: Optional[int] = None
     list: List[Issue]
+    next_cursor: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -398,9 +439,68 @@ class IssueAdd(BaseModel):
     task_id: str = Field(min_length=36, max_length=36)
 
 
+class IssueBulkUpdate(IssueAdd):
+    id: str = Field(min_length=36, max_length=36)
+
+
+class BulkItem(BaseModel):
+    index: int
+    id: str
+
+
+class BulkError(BaseModel):
+    index: int
+    id: Optional[str] = None
+    detail: str
+
+
+class BulkResult(BaseModel):
+    succeeded: List[BulkItem]
+    failed: List[BulkError]
+
+
+class IssueNode(BaseModel):
+    id: str
+    name: str
+    description: Optional[str]
+    status: IssueStatusEnum
+    priority: IssuePriorityEnum
+
+    class Config:
+        orm_mode = True
+
+
+class TaskNode(BaseModel):
+    id: str
+    name: str
+    description: Optional[str]
+    status: TaskStatusEnum
+    issues: List[IssueNode] = Field(validation_alias="issue")
+
+    class Config:
+        orm_mode = True
+
+
+class ModuleNode(BaseModel):
+    id: str
+    name: str
+    description: Optional[str]
+    module_type: Master
+    tasks: List[TaskNode] = Field(validation_alias="task")
+
+    class Config:
+        orm_mode = True
+
+
+class ProjectTree(Project):
+    modules: List[ModuleNode]
+
+
 class ProjectUserAssign(BaseModel):
     project_id: str = Field(min_length=36, max_length=36)
-    admin_user_ids: List[str] = Field(min_items=1, min_length=36, max_length=36)
+    admin_user_ids: List[Annotated[str, Field(min_length=36, max_length=36)]] = Field(
+        min_length=1
+    )
 
     @validator("admin_user_ids")
     def validate_admin_user_ids(cls, admin_user_ids):
@@ -420,7 +520,9 @@ class ProjectUser(BaseModel):
 
 class IssueUserAssign(BaseModel):
     issue_id: str = Field(min_length=36, max_length=36)
-    admin_user_ids: List[str] = Field(min_items=1, min_length=36, max_length=36)
+    admin_user_ids: List[Annotated[str, Field(min_length=36, max_length=36)]] = Field(
+        min_length=1
+    )
 
     @validator("admin_user_ids")
     def validate_admin_user_ids(cls, admin_user_ids):
@@ -0,0 +1,188 @@
+"""Email outbox delivery, retries and dead-lettering against the SMTP stub.
+
+Run from the project root with the smtp backend:
+`PRO_EMAIL_BACKEND=smtp PRO_SMTP_PORT=1025 python -m benchmarks.email_outbox
+[emails] [fail_first] [database_url]`
+
+Starts benchmarks.smtp_stub on PRO_SMTP_HOST:PRO_SMTP_PORT and queues
+`emails` emails (default 100) plus one to fail@example.com, which the stub
+always rejects. The stub also rejects the first `fail_first` sends (default
+5), so those emails go through a retry before they are delivered.
+
+The outbox is drained until nothing is pending. Instead of waiting out
+the backoff, each retry is brought forward once its delay has been
+recorded. The script checks four things:
+- every email is delivered exactly once
+- the failing one is retried on the PRO_EMAIL_OUTBOX_BACKOFF * 2^n schedule
+- it ends up DEAD after PRO_EMAIL_OUTBOX_MAX_ATTEMPTS attempts
+- on MySQL, several concurrent workers never claim the same row, thanks to
+  SKIP LOCKED
+
+It exits with 1 when a check fails. Uses a fresh SQLite file by default,
+or `database_url` when given (use a scratch database).
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+
+from sqlalchemy import create_engine
+
+from app.config import (
+    EMAIL_BACKEND,
+    EMAIL_OUTBOX_BACKOFF,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    SMTP_HOST,
+    SMTP_PORT,
+)
+from app.database import Base, SessionLocal
+from app.libs.utils import now
+from app.models.emails import EmailOutboxModel, EmailStatusEnum
+from app.routers.admin.crud.common.outbox import drain_outbox, enqueue_email
+from benchmarks.smtp_stub import SmtpStub
+
+FAILING = "fail@example.com"
+
+
+def enqueue(emails, prefix):
+    db = SessionLocal()
+    try:
+        for i in range(emails):
+            enqueue_email(
+                db, ["user@example.com"], subject=f"{prefix} {i}", body="<p>Hi</p>"
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def pending(db):
+    return db.query(EmailOutboxModel).filter(
+        EmailOutboxModel.status == EmailStatusEnum.PENDING
+    )
+
+
+def drain(db):
+    """Drain until nothing is pending, returns the failing email's retry delays."""
+    delays = []
+    attempts = 0
+    while pending(db).count():
+        drain_outbox(db)
+        failing = pending(db).filter(
+            EmailOutboxModel.recipients == json.dumps([FAILING])
+        )
+        for db_email in failing:
+            # Only rounds whose batch reached it
+            if db_email.attempts > attempts:
+                attempts = db_email.attempts
+                delay = db_email.next_attempt_at - db_email.updated_at
+                delays.append(round(delay.total_seconds()))
+        # Bring the retries forward rather than waiting out the backoff
+        pending(db).update(
+            {EmailOutboxModel.next_attempt_at: now()}, synchronize_session=False
+        )
+        db.commit()
+    return delays
+
+
+def concurrent_drain(emails, workers):
+    """Queue `emails` more and drain them with `workers` sessions at once."""
+    enqueue(emails, "Concurrent")
+
+    def worker():
+        db = SessionLocal()
+        try:
+            while drain_outbox(db, batch_size=10):
+                pass
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def check(name, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {name} {detail}".rstrip())
+    return ok
+
+
+def main(emails=100, fail_first=5, database_url=None):
+    if EMAIL_BACKEND != "smtp":
+        sys.exit("Set PRO_EMAIL_BACKEND=smtp so the outbox sends to the stub")
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "email_outbox.db")
+        database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(engine)
+
+    stub = SmtpStub(host=SMTP_HOST, port=SMTP_PORT, fail_first=fail_first).start()
+    db = SessionLocal()
+    try:
+        enqueue(emails, "Email")
+        db_email = enqueue_email(db, [FAILING], subject="Failing", body="<p>Hi</p>")
+        db.commit()
+        failing_id = db_email.id
+
+        delays = drain(db)
+        db.expire_all()
+        db_email = db.get(EmailOutboxModel, failing_id)
+        sent = Counter(envelope.content for envelope in stub.messages)
+        subjects = Counter(
+            subject
+            for (subject,) in db.query(EmailOutboxModel.subject).filter(
+                EmailOutboxModel.status == EmailStatusEnum.SENT
+            )
+        )
+        schedule = [
+            EMAIL_OUTBOX_BACKOFF * 2**attempt
+            for attempt in range(EMAIL_OUTBOX_MAX_ATTEMPTS - 1)
+        ]
+        results = [
+            check(
+                "delivered once",
+                len(stub.messages) == emails
+                and len(subjects) == emails
+                and max(sent.values()) == 1,
+                f"{len(stub.messages)}/{emails}, {stub.rejected} rejected",
+            ),
+            check("backoff", delays == schedule, f"{delays}s"),
+            check(
+                "dead letter",
+                db_email.status == EmailStatusEnum.DEAD
+                and db_email.attempts == EMAIL_OUTBOX_MAX_ATTEMPTS,
+                f"{db_email.status.name} after {db_email.attempts} attempts: "
+                f"{db_email.last_error}",
+            ),
+        ]
+
+        if engine.dialect.name == "mysql":
+            stub.messages.clear()
+            concurrent_drain(emails, workers=4)
+            sent = Counter(envelope.content for envelope in stub.messages)
+            results.append(
+                check(
+                    "skip locked",
+                    len(stub.messages) == emails and max(sent.values()) == 1,
+                    f"{len(stub.messages)}/{emails} sent by 4 workers",
+                )
+            )
+        else:
+            print(f"skip skip locked, needs MySQL ({engine.dialect.name})")
+    finally:
+        db.close()
+        stub.stop()
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    counts = [int(arg) for arg in args[:2]]
+    main(*counts, *args[2:])
@@ -0,0 +1,131 @@
+"""Throughput and peak memory of the streaming /export.
+
+Run from the project root: `python -m benchmarks.export [rows] [database_url]`
+
+Seeds `rows` tasks (default 1,000,000) into a fresh SQLite file, or into
+`database_url` when given (use a scratch database), then streams them as
+NDJSON and CSV the same way the /tasks/export endpoint does.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+
+from app.database import Base, SessionLocal
+from app.libs.export import EXPORT_FORMATS, export_rows
+from app.libs.utils import generate_id
+from app.models import (
+    AdminUserModel,
+    ModuleModel,
+    ModuleTypeModel,
+    ProjectModel,
+    TaskModel,
+)
+from app.routers.admin.schemas import Task
+
+CHUNK = 10000
+
+
+def seed(rows):
+    db = SessionLocal()
+    try:
+        admin_user_id = generate_id()
+        project_id = generate_id()
+        module_type_id = generate_id()
+        module_id = generate_id()
+        db.add(
+            AdminUserModel(
+                id=admin_user_id, name="Bench", email="bench@x.com", password="x"
+            )
+        )
+        db.add(
+            ProjectModel(
+                id=project_id,
+                name="Bench",
+                start_date=date.today(),
+                end_date=date.today(),
+                manager_id=admin_user_id,
+            )
+        )
+        db.add(ModuleTypeModel(id=module_type_id, name="Bench"))
+        db.add(
+            ModuleModel(
+                id=module_id,
+                name="Bench",
+                description="Bench",
+                project_id=project_id,
+                module_type_id=module_type_id,
+            )
+        )
+        db.commit()
+
+        start = datetime.now()
+        for offset in range(0, rows, CHUNK):
+            batch = []
+            for i in range(offset, min(offset + CHUNK, rows)):
+                created_at = start - timedelta(seconds=i)
+                batch.append(
+                    {
+                        "id": generate_id(),
+                        "name": f"Task {i}",
+                        "description": f"Benchmark task number {i}",
+                        "module_id": module_id,
+                        "is_deleted": False,
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    }
+                )
+            db.execute(insert(TaskModel), batch)
+            db.commit()
+    finally:
+        db.close()
+
+
+def run(format, trace=False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = size = 0
+    for chunk in export_rows(TaskModel, schema=Task, format=format):
+        size += len(chunk)
+        rows += chunk.count(b"\n")
+    elapsed = time.perf_counter() - start
+    if format == "csv":
+        # The header line is not a row
+        rows -= 1
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return rows, size, elapsed, peak
+
+
+def main(rows=1000000, database_url=None):
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "export.db")
+        database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    seed(rows)
+    print(f"seeded {rows} tasks in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'format':<7} {'rows':>9} {'MB':>8} {'rows/s':>9} {'peak MB':>8}")
+    for format in EXPORT_FORMATS:
+        rows, size, elapsed, _ = run(format)
+        _, _, _, peak = run(format, trace=True)
+        print(
+            f"{format:<7} {rows:>9} {size / 2**20:>8.1f} "
+            f"{rows / elapsed:>9.0f} {peak / 2**20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    main(int(args[0]) if args else 1000000, *args[1:])
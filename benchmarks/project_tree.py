@@ -0,0 +1,183 @@
+"""GET /projects/{id}/tree against the per-module/per-task fan-out it replaces.
+
+Run from the project root:
+`python -m benchmarks.project_tree [modules] [tasks] [issues] [database_url]`
+
+Seeds one project with `modules` modules (default 50), `tasks` tasks per
+module (default 40) and `issues` issues per task (default 5) into a fresh
+SQLite file, or into `database_url` when given (use a scratch database).
+The fan-out reads the project, its modules, then the tasks of every module
+and the issues of every task, one query each, the way a client calling the
+list endpoints does. The tree streams the same data with one query per
+level per batch of modules.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from sqlalchemy import create_engine, event, insert
+
+from app.database import Base, SessionLocal
+from app.libs.utils import generate_id
+from app.models import (
+    AdminUserModel,
+    IssueModel,
+    ModuleModel,
+    ModuleTypeModel,
+    ProjectModel,
+    TaskModel,
+)
+from app.routers.admin.crud.projects.projects import get_project
+from app.routers.admin.crud.projects.tree import get_project_tree
+from app.routers.admin.schemas import Issue, Module, Project, Task
+
+queries = 0
+
+
+def count_query(*args):
+    global queries
+    queries += 1
+
+
+def seed(modules, tasks, issues):
+    db = SessionLocal()
+    try:
+        admin_user_id = generate_id()
+        project_id = generate_id()
+        module_type_id = generate_id()
+        db.add(
+            AdminUserModel(
+                id=admin_user_id, name="Bench", email="bench@x.com", password="x"
+            )
+        )
+        db.add(
+            ProjectModel(
+                id=project_id,
+                name="Bench",
+                start_date=date.today(),
+                end_date=date.today(),
+                manager_id=admin_user_id,
+            )
+        )
+        db.add(ModuleTypeModel(id=module_type_id, name="Bench"))
+        db.commit()
+
+        for m in range(modules):
+            module_id = generate_id()
+            db.add(
+                ModuleModel(
+                    id=module_id,
+                    name=f"Module {m}",
+                    description="Bench",
+                    project_id=project_id,
+                    module_type_id=module_type_id,
+                )
+            )
+            db.flush()
+            task_rows = [
+                {"id": generate_id(), "name": f"Task {m}.{t}", "module_id": module_id}
+                for t in range(tasks)
+            ]
+            db.execute(insert(TaskModel), task_rows)
+            issue_rows = [
+                {
+                    "id": generate_id(),
+                    "name": f"Issue {i}",
+                    "image": "",
+                    "task_id": task["id"],
+                }
+                for task in task_rows
+                for i in range(issues)
+            ]
+            if issue_rows:
+                db.execute(insert(IssueModel), issue_rows)
+            db.commit()
+        return project_id
+    finally:
+        db.close()
+
+
+def dumped_size(schema, row):
+    return len(schema.model_validate(row, from_attributes=True).model_dump_json())
+
+
+def fan_out(project_id):
+    db = SessionLocal()
+    try:
+        size = dumped_size(Project, get_project(db, project_id))
+        modules = db.query(ModuleModel).filter(
+            ModuleModel.project_id == project_id, ModuleModel.is_deleted == False
+        )
+        for module in modules.all():
+            size += dumped_size(Module, module)
+            tasks = db.query(TaskModel).filter(
+                TaskModel.module_id == module.id, TaskModel.is_deleted == False
+            )
+            for task in tasks.all():
+                size += dumped_size(Task, task)
+                issues = db.query(IssueModel).filter(
+                    IssueModel.task_id == task.id, IssueModel.is_deleted == False
+                )
+                for issue in issues.all():
+                    size += dumped_size(Issue, issue)
+        return size
+    finally:
+        db.close()
+
+
+def tree(project_id):
+    db = SessionLocal()
+    try:
+        return sum(len(chunk) for chunk in get_project_tree(db, project_id))
+    finally:
+        db.close()
+
+
+def run(func, project_id, trace=False):
+    global queries
+    queries = 0
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    size = func(project_id)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return queries, size, elapsed, peak
+
+
+def main(modules=50, tasks=40, issues=5, database_url=None):
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "project_tree.db")
+        database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    project_id = seed(modules, tasks, issues)
+    print(
+        f"seeded {modules} modules, {modules * tasks} tasks, "
+        f"{modules * tasks * issues} issues in {time.perf_counter() - start:.1f}s"
+    )
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    print(f"{'pattern':<8} {'queries':>8} {'KB':>8} {'ms':>8} {'peak MB':>8}")
+    for name, func in (("fan-out", fan_out), ("tree", tree)):
+        count, size, elapsed, _ = run(func, project_id)
+        _, _, _, peak = run(func, project_id, trace=True)
+        print(
+            f"{name:<8} {count:>8} {size / 2**10:>8.0f} "
+            f"{elapsed * 1000:>8.0f} {peak / 2**20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:5]
+    counts = [int(arg) for arg in args[:3]]
+    main(*counts, *args[3:])
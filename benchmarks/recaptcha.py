@@ -0,0 +1,46 @@
+"""Concurrent captcha verification latency against the local stub.
+
+Start the stub first (`python -m benchmarks.recaptcha_stub 9100 50`), then
+run from the project root with captcha enabled:
+
+PRO_RE_CAPTCHA_ENABLED=true \
+PRO_RE_CAPTCHA_URL=http://127.0.0.1:9100/recaptcha/api/siteverify \
+python -m benchmarks.recaptcha [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+from app.libs.recaptcha import breaker, close_client, verify_captcha
+
+
+async def timed_verify(latencies):
+    start = time.perf_counter()
+    await verify_captcha(captcha_token="token")
+    latencies.append(time.perf_counter() - start)
+
+
+async def main(requests=1000, concurrency=100):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker():
+        async with semaphore:
+            await timed_verify(latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    await close_client()
+
+    latencies.sort()
+    print(f"requests    {requests}")
+    print(f"concurrency {concurrency}")
+    print(f"req/s       {requests / elapsed:.0f}")
+    print(f"p50 ms      {latencies[len(latencies) // 2] * 1000:.1f}")
+    print(f"p99 ms      {latencies[int(len(latencies) * 0.99)] * 1000:.1f}")
+    print(f"breaker     {breaker.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*[int(arg) for arg in sys.argv[1:3]]))
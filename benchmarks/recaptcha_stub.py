@@ -0,0 +1,36 @@
+"""Local stand-in for Google's siteverify endpoint.
+
+`python -m benchmarks.recaptcha_stub [port] [delay_ms]` then point
+`PRO_RE_CAPTCHA_URL` at `http://127.0.0.1:<port>/recaptcha/api/siteverify`.
+The token "invalid" fails verification, every other token passes.
+"""
+import asyncio
+import os
+import sys
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+
+DELAY = float(os.environ.get("STUB_DELAY_MS", "0")) / 1000
+
+
+@app.post("/recaptcha/api/siteverify")
+async def siteverify(request: Request):
+    form = parse_qs((await request.body()).decode("utf-8"))
+    token = form.get("response", [""])[0]
+    if DELAY:
+        await asyncio.sleep(DELAY)
+    if token == "invalid":
+        return {"success": False, "error-codes": ["invalid-input-response"]}
+    return {"success": True, "hostname": "localhost"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9100
+    if len(sys.argv) > 2:
+        DELAY = float(sys.argv[2]) / 1000
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
@@ -0,0 +1,54 @@
+"""Local SMTP stand-in for the email outbox.
+
+`python -m benchmarks.smtp_stub [port] [fail_first]` then run the app with
+`PRO_EMAIL_BACKEND=smtp PRO_SMTP_PORT=<port>`. Messages to a `fail@`
+address are always rejected with a temporary 451, and so are the first
+`fail_first` messages overall. Everything else is accepted and kept in
+`messages`.
+"""
+import sys
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+TEMPORARY_FAILURE = "451 4.3.0 Temporary failure, try again later"
+
+
+class SmtpStub:
+    def __init__(self, host="127.0.0.1", port=1025, fail_first=0):
+        self.fail_first = fail_first
+        self.messages = []
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._controller = Controller(self, hostname=host, port=port)
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            failing = any(
+                address.lower().startswith("fail@") for address in envelope.rcpt_tos
+            )
+            if failing or self.rejected < self.fail_first:
+                self.rejected += 1
+                return TEMPORARY_FAILURE
+            self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+    def start(self):
+        self._controller.start()
+        return self
+
+    def stop(self):
+        self._controller.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    fail_first = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    stub = SmtpStub(port=port, fail_first=fail_first).start()
+    print(f"SMTP stub on 127.0.0.1:{port}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
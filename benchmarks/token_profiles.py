@@ -0,0 +1,35 @@
+"""Compare issue/verify throughput and token size of the token profiles.
+
+Run from the project root: `python -m benchmarks.token_profiles`
+"""
+import sys
+import time
+
+from app.libs.tokens import TOKEN_PROFILES, decode_token, issue_token
+
+CLAIMS = {
+    "id": "0b5c8c8e-6a4f-4a4e-9f0b-6f5b0f2f6a1d",
+    "email": "super.admin@example.com",
+    "time": "2024-01-01 00:00:00.000000",
+}
+
+
+def measure(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main(iterations=2000):
+    print(f"{'profile':<10} {'bytes':>6} {'issue/s':>10} {'verify/s':>10}")
+    for profile in TOKEN_PROFILES:
+        token = issue_token(CLAIMS, profile=profile)
+        issue_rate = measure(lambda: issue_token(CLAIMS, profile=profile), iterations)
+        verify_rate = measure(lambda: decode_token(token), iterations)
+        print(f"{profile:<10} {len(token):>6} {issue_rate:>10.0f} {verify_rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])